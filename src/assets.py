@@ -0,0 +1,66 @@
+import hashlib
+import json
+import os
+import re
+
+# Hex digits of the content hash put in a fingerprinted file name.
+HASH_LENGTH = 12
+
+# A root-relative href or src attribute in template markup. The spacing
+# around "=" is kept as written.
+_URL_ATTR = re.compile(r'\b(href|src)(\s*=\s*")(/[^"]*)"')
+
+_QUERY = re.compile(r"[?#]")
+
+
+class AssetMap():
+    # Maps the URL a static asset is referenced by to the URL of its
+    # fingerprinted copy: {"/index.css": "/index.0123456789ab.css"}. It is
+    # kept in the build manifest, and digest covers the whole map so rendered
+    # pages can be cached against it.
+    def __init__(self, urls=None):
+        self.urls = urls if urls is not None else {}
+        self.digest = hashlib.sha256(json.dumps(self.urls, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def url(self, url):
+        # A query or fragment is kept on the rewritten URL.
+        match = _QUERY.search(url)
+        if match is None:
+            return self.urls.get(url, url)
+        return self.urls.get(url[:match.start()], url[:match.start()]) + url[match.start():]
+
+    def fingerprint(self, url):
+        return self.urls.get(url)
+
+    def __repr__(self):
+        return f"AssetMap({len(self.urls)} assets)"
+
+
+def fingerprinted_path(path, digest):
+    stem, suffix = os.path.splitext(path)
+    return f"{stem}.{digest[:HASH_LENGTH]}{suffix}"
+
+
+def asset_map(static, source_dir_path, dest_dir_path):
+    # static is the manifest's static entries; an asset copied under a
+    # fingerprinted name is mapped from the URL its source path gives it.
+    urls = {}
+    for from_path, entry in static.items():
+        url = "/" + os.path.relpath(from_path, source_dir_path).replace(os.sep, "/")
+        dest_url = "/" + os.path.relpath(entry["dest"], dest_dir_path).replace(os.sep, "/")
+        if dest_url != url:
+            urls[url] = dest_url
+    return AssetMap(urls)
+
+
+def rewrite_urls(text, basepath="/", assets=None):
+    # Each root-relative href and src goes through the asset map and gets
+    # the basepath in a single pass over the text.
+    if basepath == "/" and assets is None:
+        return text
+
+    def rewrite(match):
+        url = assets.url(match.group(3)) if assets is not None else match.group(3)
+        return f'{match.group(1)}{match.group(2)}{basepath}{url[1:]}"'
+
+    return _URL_ATTR.sub(rewrite, text)
@@ -0,0 +1,88 @@
+import hashlib
+import os
+import pickle
+
+import block_markdown
+import frontmatter
+import htmlnode
+import inline_markdown
+import inlinecache
+import pagemeta
+import textnode
+
+default_max_bytes = 256 * 1024 * 1024
+
+_parser_version = None
+
+
+def parser_version():
+    # Hash of the parser sources, so editing the parser invalidates every
+    # cached tree without anyone having to remember to bump a number.
+    global _parser_version
+    if _parser_version is None:
+        digest = hashlib.sha256()
+        for module in (block_markdown, frontmatter, inline_markdown, inlinecache, textnode, htmlnode, pagemeta):
+            with open(module.__file__, "rb") as f:
+                digest.update(f.read())
+        _parser_version = digest.hexdigest()
+    return _parser_version
+
+
+def cache_key(markdown):
+    digest = hashlib.sha256(parser_version().encode("ascii"))
+    digest.update(markdown.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _entry_path(cache_dir, key):
+    return os.path.join(cache_dir, key[:2], key + ".pickle")
+
+
+def load(cache_dir, key):
+    path = _entry_path(cache_dir, key)
+    try:
+        with open(path, "rb") as f:
+            value = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        # A truncated or stale entry is just a miss.
+        return None
+    # Touch the entry so pruning sees it as recently used.
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return value
+
+
+def store(cache_dir, key, value):
+    path = _entry_path(cache_dir, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def prune(cache_dir, max_bytes=default_max_bytes):
+    # Least recently used entries go first until the cache fits max_bytes.
+    if not os.path.isdir(cache_dir):
+        return 0
+    entries = []
+    total = 0
+    for dir_path, _, filenames in os.walk(cache_dir):
+        for filename in filenames:
+            path = os.path.join(dir_path, filename)
+            stat = os.stat(path)
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+            total += stat.st_size
+    entries.sort()
+    removed = 0
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        os.remove(path)
+        total -= size
+        removed += 1
+    return removed
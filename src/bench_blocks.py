@@ -0,0 +1,109 @@
+import argparse
+import random
+import timeit
+
+from block_markdown import (
+    BlockType,
+    block_to_html_node,
+    code_to_html_node,
+    heading_to_html_node,
+    markdown_to_blocks,
+    parse_block,
+    text_to_children,
+)
+from corpus import DEFAULT_MIX, parse_weights, synthetic_page
+from htmlnode import ParentNode
+
+LIST_HEAVY_MIX = "heading=5,paragraph=5,ulist=45,olist=35,quote=10,code=0,image=0"
+
+
+def legacy_block_to_block(block):
+    # The classifier before parse_block: one split to classify, then each
+    # converter splits and scans the same lines again.
+    lines = block.split("\n")
+    if block.startswith(("# ", "## ", "### ", "#### ", "##### ", "###### ")):
+        return BlockType.HEADING
+    if len(lines) > 1 and lines[0].startswith("```") and lines[-1].startswith("```"):
+        return BlockType.CODE
+    if block.startswith(">"):
+        for line in lines:
+            if not line.startswith(">"):
+                return BlockType.PARAGRAPH
+        return BlockType.QUOTE
+    if block.startswith("- "):
+        for line in lines:
+            if not line.startswith("- "):
+                return BlockType.PARAGRAPH
+        return BlockType.ULIST
+    if block.startswith("1. "):
+        i = 1
+        for line in lines:
+            if not line.startswith(f"{i}. "):
+                return BlockType.PARAGRAPH
+            i += 1
+        return BlockType.OLIST
+    return BlockType.PARAGRAPH
+
+
+def legacy_block_lines(block):
+    block_type = legacy_block_to_block(block)
+    if block_type == BlockType.PARAGRAPH:
+        return block_type, block.split("\n")
+    if block_type == BlockType.OLIST:
+        return block_type, [item[3:] for item in block.split("\n")]
+    if block_type == BlockType.ULIST:
+        return block_type, [item[2:] for item in block.split("\n")]
+    if block_type == BlockType.QUOTE:
+        lines = []
+        for line in block.split("\n"):
+            if not line.startswith(">"):
+                raise ValueError("not a vaild quote")
+            lines.append(line.lstrip(">").strip())
+        return block_type, lines
+    return block_type, None
+
+
+def legacy_block_to_html_node(block):
+    block_type, lines = legacy_block_lines(block)
+    if block_type == BlockType.HEADING:
+        return heading_to_html_node(block)
+    if block_type == BlockType.CODE:
+        return code_to_html_node(block)
+    if block_type in (BlockType.OLIST, BlockType.ULIST):
+        tag = "ol" if block_type == BlockType.OLIST else "ul"
+        return ParentNode(tag, [ParentNode("li", text_to_children(text)) for text in lines])
+    tag = "blockquote" if block_type == BlockType.QUOTE else "p"
+    return ParentNode(tag, text_to_children(" ".join(lines)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare single-pass block parsing with the old classifier")
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--page-kb", type=float, default=64)
+    parser.add_argument("--mix", default=LIST_HEAVY_MIX)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    mix = parse_weights(args.mix, DEFAULT_MIX)
+    blocks = []
+    for _ in range(args.pages):
+        blocks.extend(markdown_to_blocks(synthetic_page(rng, int(args.page_kb * 1000), mix)))
+    for block in blocks:
+        if legacy_block_lines(block) != parse_block(block):
+            raise ValueError(f"parse_block disagrees with the old classifier on {block[:40]!r}")
+
+    cases = [
+        ("classify + split lines", lambda: [legacy_block_lines(b) for b in blocks], lambda: [parse_block(b) for b in blocks]),
+        ("block_to_html_node", lambda: [legacy_block_to_html_node(b) for b in blocks], lambda: [block_to_html_node(b) for b in blocks]),
+    ]
+    print(f"{len(blocks)} blocks, mix {args.mix}")
+    print(f"{'stage':<24} {'before ms':>10} {'after ms':>10} {'speedup':>8}")
+    for name, before, after in cases:
+        old = min(timeit.repeat(before, number=1, repeat=args.repeat))
+        new = min(timeit.repeat(after, number=1, repeat=args.repeat))
+        print(f"{name:<24} {old * 1000:>10.2f} {new * 1000:>10.2f} {old / new:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import argparse
+import timeit
+
+from inline_markdown import cascade_to_textnodes, text_to_textnodes
+
+
+def link_heavy_paragraph(links):
+    # One long run of links, like a generated index page. Formatting only
+    # appears at the ends so the cascade's link pass sees a single text node.
+    body = " and ".join(f"[page {i}](/blog/page{i})" for i in range(links))
+    return f"**Index:** {body} ![footer](/images/footer.png)"
+
+
+def bench(links, repeat):
+    text = link_heavy_paragraph(links)
+    if cascade_to_textnodes(text) != text_to_textnodes(text):
+        raise ValueError(f"scanner and cascade disagree on {links} links")
+    cascade = min(timeit.repeat(lambda: cascade_to_textnodes(text), number=1, repeat=repeat))
+    scanner = min(timeit.repeat(lambda: text_to_textnodes(text), number=1, repeat=repeat))
+    return cascade, scanner
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the inline scanner with the split cascade")
+    parser.add_argument("--links", type=int, nargs="+", default=[10, 100, 1000, 5000, 20000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'links':>8} {'cascade ms':>12} {'scanner ms':>12} {'speedup':>8}")
+    for links in args.links:
+        cascade, scanner = bench(links, args.repeat)
+        print(f"{links:>8} {cascade * 1000:>12.3f} {scanner * 1000:>12.3f} {cascade / scanner:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import argparse
+import os
+import resource
+import tempfile
+import time
+import tracemalloc
+
+from block_markdown import markdown_to_blocks, markdown_to_html_node
+from corpus import write_corpus
+from gencontent import collect_pages
+from inline_markdown import text_to_textnodes
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def build_pass(pages):
+    start = time.perf_counter()
+    written = 0
+    for from_path, _ in pages:
+        with open(from_path) as f:
+            written += len(markdown_to_html_node(f.read()).to_html())
+    return time.perf_counter() - start, written
+
+
+def retained_pass(pages):
+    # Hold every node of the sample alive, as a large page does while it is
+    # serialized, and count the blocks tracemalloc sees.
+    tracemalloc.start()
+    baseline = tracemalloc.take_snapshot()
+    trees = []
+    textnodes = []
+    for from_path, _ in pages:
+        with open(from_path) as f:
+            markdown = f.read()
+        trees.append(markdown_to_html_node(markdown))
+        for block in markdown_to_blocks(markdown):
+            if not block.startswith("```"):
+                textnodes.append(text_to_textnodes(block.replace("\n", " ")))
+    current, peak = tracemalloc.get_traced_memory()
+    stats = tracemalloc.take_snapshot().compare_to(baseline, "filename")
+    tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in stats)
+    return current, peak, blocks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure node memory on a synthetic content tree")
+    parser.add_argument("--size-mb", type=float, default=50)
+    parser.add_argument("--page-kb", type=float, default=64)
+    parser.add_argument("--sample-mb", type=float, default=4, help="content held in memory for the allocation count")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        page_bytes = int(args.page_kb * 1e3)
+        count = max(1, int(args.size_mb * 1e6 / page_bytes))
+        write_corpus(root, count, page_bytes)
+        pages = collect_pages(root, os.path.join(root, "out"))
+        print(f"corpus: {count} pages, {args.size_mb:g}MB")
+
+        rss_before = peak_rss_mb()
+        elapsed, written = build_pass(pages)
+        print(f"build: {elapsed:.2f}s, {written / 1e6:.1f}MB html, peak RSS {peak_rss_mb():.1f}MB (start {rss_before:.1f}MB)")
+
+        sample = pages[: max(1, int(len(pages) * args.sample_mb / args.size_mb))]
+        current, peak, blocks = retained_pass(sample)
+        print(
+            f"retained {len(sample)} pages: {current / 1e6:.1f}MB in {blocks} blocks, "
+            f"tracemalloc peak {peak / 1e6:.1f}MB, peak RSS {peak_rss_mb():.1f}MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import timeit
+from contextlib import redirect_stdout
+from io import StringIO
+
+from block_markdown import block_to_block, markdown_to_blocks, markdown_to_html_node
+from corpus import add_corpus_arguments, corpus_options, write_corpus
+from gencontent import generate_pages_recursive
+from inline_markdown import text_to_textnodes
+
+default_baseline_path = "./.cache/benchmark.json"
+default_threshold = 1.25
+
+
+def prepare(root, options):
+    content = os.path.join(root, "content")
+    paths = write_corpus(content, **options)
+    template = os.path.join(root, "template.html")
+    with open(template, "w") as f:
+        f.write("<html><title>{{ Title }}</title><body>{{ Content }}</body></html>")
+
+    documents = []
+    for path in paths:
+        with open(path) as f:
+            documents.append(f.read())
+    blocks = [block for document in documents for block in markdown_to_blocks(document)]
+    inline = [" ".join(block.split("\n")) for block in blocks if not block.startswith("```")]
+    trees = [markdown_to_html_node(document) for document in documents]
+    return {
+        "content": content,
+        "template": template,
+        "dest": os.path.join(root, "docs"),
+        "documents": documents,
+        "blocks": blocks,
+        "inline": inline,
+        "trees": trees,
+    }
+
+
+def benchmarks(data):
+    def bench_markdown_to_blocks():
+        for document in data["documents"]:
+            markdown_to_blocks(document)
+
+    def bench_block_to_block():
+        for block in data["blocks"]:
+            block_to_block(block)
+
+    def bench_text_to_textnodes():
+        for text in data["inline"]:
+            text_to_textnodes(text)
+
+    def bench_to_html():
+        for tree in data["trees"]:
+            tree.to_html()
+
+    def bench_build():
+        with redirect_stdout(StringIO()):
+            generate_pages_recursive(data["content"], data["template"], data["dest"], "/")
+
+    return {
+        "markdown_to_blocks": bench_markdown_to_blocks,
+        "block_to_block": bench_block_to_block,
+        "text_to_textnodes": bench_text_to_textnodes,
+        "to_html": bench_to_html,
+        "build": bench_build,
+    }
+
+
+def run(options, repeat, only=None):
+    with tempfile.TemporaryDirectory() as root:
+        data = prepare(root, options)
+        results = {}
+        for name, func in benchmarks(data).items():
+            if only and name not in only:
+                continue
+            results[name] = min(timeit.repeat(func, number=1, repeat=repeat))
+    return results
+
+
+def compare(results, baseline, threshold):
+    # Returns the names that slowed down by more than `threshold` times.
+    regressions = []
+    for name, seconds in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"  {name:<20} {seconds * 1000:>10.2f}ms  (no baseline)")
+            continue
+        ratio = seconds / before
+        flag = ""
+        if ratio > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"  {name:<20} {seconds * 1000:>10.2f}ms  baseline {before * 1000:>10.2f}ms  {ratio:>5.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the markdown pipeline on a synthetic corpus")
+    add_corpus_arguments(parser)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="+", help="run only these benchmarks")
+    parser.add_argument("--baseline", default=default_baseline_path)
+    parser.add_argument("--save", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=default_threshold, help="slowdown ratio that fails the run")
+    args = parser.parse_args()
+
+    options = corpus_options(args)
+    results = run(options, args.repeat, args.only)
+
+    if args.save:
+        dir_path = os.path.dirname(args.baseline)
+        if dir_path != "":
+            os.makedirs(dir_path, exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump({"corpus": options, "results": results}, f, indent=1, sort_keys=True)
+        for name, seconds in results.items():
+            print(f"  {name:<20} {seconds * 1000:>10.2f}ms")
+        print(f"Saved baseline to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        for name, seconds in results.items():
+            print(f"  {name:<20} {seconds * 1000:>10.2f}ms")
+        print(f"No baseline at {args.baseline}; run with --save to create one")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline["corpus"] != options:
+        sys.exit(f"baseline {args.baseline} was recorded with a different corpus; rerun with --save")
+    regressions = compare(results, baseline["results"], args.threshold)
+    if regressions:
+        sys.exit(f"FAIL: {', '.join(regressions)} slower than {args.threshold}x the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,8 @@
 from enum import Enum
 from htmlnode import ParentNode
+from inlinecache import memo_text_to_textnodes
+from pagemeta import find_title
+from profiler import stage
 from inline_markdown import *
 from textnode import * 
 
@@ -22,62 +25,104 @@ def markdown_to_blocks(markdown):
         filtered_block.append(text)
     return filtered_block
 
-def block_to_block(block):
-
-    #Split text
+def iter_markdown_blocks(chunks):
+    # Streaming markdown_to_blocks: `chunks` is any iterable of text, such as
+    # an open file yielding lines. Only the block being assembled is held in
+    # memory, and the blocks match markdown_to_blocks on the joined text.
+    buffer = ""
+    for chunk in chunks:
+        scan_from = max(len(buffer) - 1, 0)
+        buffer += chunk
+        end = buffer.find("\n\n", scan_from)
+        while end != -1:
+            section = buffer[:end]
+            buffer = buffer[end + 2:]
+            if section != "":
+                yield section.strip()
+            end = buffer.find("\n\n")
+    if buffer != "":
+        yield buffer.strip()
+
+HEADING_PREFIXES = ("# ", "## ", "### ", "#### ", "##### ", "###### ")
+
+def parse_block(block):
+    # Classifies the block and strips each line's marker in the same pass, so
+    # the converters below get ready-made item texts instead of re-splitting.
+    # Returns (block_type, lines): list/quote item texts, paragraph lines, or
+    # None for headings and code, which work on the raw block.
+    if block.startswith(HEADING_PREFIXES):
+        return BlockType.HEADING, None
     lines = block.split("\n")
-
-    #Check for heading followed by space
-    if block.startswith(("# ", "## ", "### ", "#### ", "##### ", "###### ")):
-        return BlockType.HEADING
     if len(lines) > 1 and lines[0].startswith("```") and lines[-1].startswith("```"):
-        return BlockType.CODE
+        return BlockType.CODE, None
     if block.startswith(">"):
-        for line in lines:
-            if not line.startswith(">"):
-                return BlockType.PARAGRAPH
-        return BlockType.QUOTE
+        items = [line.lstrip(">").strip() for line in lines if line.startswith(">")]
+        if len(items) != len(lines):
+            return BlockType.PARAGRAPH, lines
+        return BlockType.QUOTE, items
     if block.startswith("- "):
-        for line in lines:
-            if not line.startswith("- "):
-                return BlockType.PARAGRAPH
-        return BlockType.ULIST
+        items = [line[2:] for line in lines if line.startswith("- ")]
+        if len(items) != len(lines):
+            return BlockType.PARAGRAPH, lines
+        return BlockType.ULIST, items
     if block.startswith("1. "):
-        i = 1
-        for line in lines:
-            if not line.startswith(f"{i}. "):
-                return BlockType.PARAGRAPH
-            i += 1
-        return BlockType.OLIST
-    return BlockType.PARAGRAPH
-
-def markdown_to_html_node(markdown):
-    blocks = markdown_to_blocks(markdown)
+        for i, line in enumerate(lines):
+            if not line.startswith(_olist_prefix(i + 1)):
+                return BlockType.PARAGRAPH, lines
+        return BlockType.OLIST, [line[3:] for line in lines]
+    return BlockType.PARAGRAPH, lines
+
+def block_to_block(block):
+    return parse_block(block)[0]
+
+_OLIST_PREFIXES = [f"{i}. " for i in range(100)]
+
+def _olist_prefix(number):
+    if number < len(_OLIST_PREFIXES):
+        return _OLIST_PREFIXES[number]
+    return f"{number}. "
+
+def markdown_to_html_node(markdown, meta=None):
+    # Pass a PageMeta as `meta` to collect the page's metadata while parsing.
+    # The blocks are those of markdown_to_blocks; the title is taken from
+    # each section before it is stripped, so it follows find_title's line
+    # rule without a pass of its own.
+    want_title = meta is not None and meta.title is None
     children = []
-    for block in blocks:
-        htmlnode = block_to_html_node(block)
+    for section in markdown.split("\n\n"):
+        if section == "":
+            continue
+        if want_title:
+            title = find_title(section)
+            if title is not None:
+                meta.title = title
+                want_title = False
+        htmlnode = block_to_html_node(section.strip(), meta)
         children.append(htmlnode)
     return ParentNode("div", children, None)
 
-def block_to_html_node(block):
-    block_type = block_to_block(block)
+def block_to_html_node(block, meta=None):
+    block_type, lines = parse_block(block)
     if block_type == BlockType.PARAGRAPH:
-        return paragraph_to_html_node(block)
+        return ParentNode("p", text_to_children(" ".join(lines), meta))
     if block_type == BlockType.HEADING:
-        return heading_to_html_node(block)
+        return heading_to_html_node(block, meta)
     if block_type == BlockType.CODE:
-        return code_to_html_node(block)
+        return code_to_html_node(block, meta)
     if block_type == BlockType.OLIST:
-        return olist_to_html_node(block)
+        return list_items_to_html_node("ol", lines, meta)
     if block_type == BlockType.ULIST:
-        return ulist_to_html_node(block)
+        return list_items_to_html_node("ul", lines, meta)
     if block_type == BlockType.QUOTE:
-        return quote_to_html_node(block)
+        return ParentNode("blockquote", text_to_children(" ".join(lines), meta))
 
-def text_to_children(text):
-    text_nodes = text_to_textnodes(text)
+def text_to_children(text, meta=None):
+    with stage("inline"):
+        text_nodes = memo_text_to_textnodes(text)
     children = []
     for text_node in text_nodes:
+        if meta is not None:
+            meta.add_text_node(text_node)
         html_node = text_node_to_html_node(text_node)
         children.append(html_node)
     return children
@@ -88,7 +133,7 @@ def paragraph_to_html_node(block):
     children = text_to_children(paragraph)
     return ParentNode("p", children)
 
-def heading_to_html_node(block):
+def heading_to_html_node(block, meta=None):
     level = 0
     for char in block:
         if char == "#":
@@ -98,35 +143,36 @@ def heading_to_html_node(block):
     if level + 1 >= len(block):
         raise ValueError(f"invalid heading level: {level}")
     text = block[level + 1:]
-    children = text_to_children(text)
+    if meta is not None:
+        meta.add_heading(level, text)
+    children = text_to_children(text, meta)
     return ParentNode(f"h{level}", children)
 
-def code_to_html_node(block):
+def code_to_html_node(block, meta=None):
     if not block.startswith("```") or not block.endswith("```"):
         raise ValueError("invalid code block")
     text = block[4:-3]
+    if meta is not None:
+        meta.add_words(text)
     raw_text = TextNode(text, TextType.TEXT)
     children = text_node_to_html_node(raw_text)
     code = ParentNode("code", [children])
     return ParentNode("pre", [code])
 
 def olist_to_html_node(block):
-    items = block.split("\n")
-    html_item =[]
-    for item in items:
-        text = item[3:]
-        children = text_to_children(text)
-        html_item.append(ParentNode("li", children))
-    return ParentNode("ol", html_item)
+    items = [item[3:] for item in block.split("\n")]
+    return list_items_to_html_node("ol", items)
 
 def ulist_to_html_node(block):
-    items = block.split("\n")
+    items = [item[2:] for item in block.split("\n")]
+    return list_items_to_html_node("ul", items)
+
+def list_items_to_html_node(tag, items, meta=None):
     html_item = []
-    for item in items:
-        text = item[2:]
-        children = text_to_children(text)
+    for text in items:
+        children = text_to_children(text, meta)
         html_item.append(ParentNode("li", children))
-    return ParentNode("ul", html_item)
+    return ParentNode(tag, html_item)
 
 def quote_to_html_node(block):
     lines = block.split("\n")
@@ -0,0 +1,57 @@
+import gzip
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from manifest import write_if_changed
+
+COMPRESSIBLE_SUFFIXES = (".html", ".css", ".js", ".svg", ".xml", ".json", ".txt")
+
+
+def gz_path(path):
+    return path + ".gz"
+
+
+def is_compressible(path):
+    return path.endswith(COMPRESSIBLE_SUFFIXES)
+
+
+def precompress(paths, jobs=None):
+    # Writes a .gz sibling next to each compressible output. A sibling
+    # carries its source's mtime, so it is redone only for outputs the build
+    # actually rewrote. zlib releases the GIL, so a thread pool compresses
+    # in parallel. Returns the number of siblings written.
+    stale = [path for path in paths if is_compressible(path) and _needs_compress(path)]
+    if len(stale) < 2:
+        return sum(compress_file(path) for path in stale)
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        return sum(executor.map(compress_file, stale))
+
+
+def remove_compressed(paths):
+    # Removes the .gz siblings of paths; returns how many there were.
+    removed = 0
+    for path in paths:
+        try:
+            os.remove(gz_path(path))
+        except FileNotFoundError:
+            continue
+        removed += 1
+    return removed
+
+
+def _needs_compress(path):
+    try:
+        gz_stat = os.stat(gz_path(path))
+    except FileNotFoundError:
+        return True
+    return gz_stat.st_mtime_ns != os.stat(path).st_mtime_ns
+
+
+def compress_file(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    stat = os.stat(path)
+    # mtime=0 keeps the gzip header, and so the .gz bytes, reproducible.
+    write_if_changed(gz_path(path), gzip.compress(data, compresslevel=9, mtime=0))
+    os.utime(gz_path(path), ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    return 1
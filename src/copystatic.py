@@ -1,17 +1,146 @@
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 
-def copy_files_recursive(source_dir_path, dest_dir_path):
-    if not os.path.exists(dest_dir_path):
-        os.mkdir(dest_dir_path)
+from assets import fingerprinted_path
+from manifest import remove_output, source_entry
 
-    for filename in os.listdir(source_dir_path):
-        from_path = os.path.join(source_dir_path,filename)
-        dest_path = os.path.join(dest_dir_path, filename)
-        print(f" * {from_path} -> {dest_path}")
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# ioctl request number for FICLONE (linux/fs.h); clones extents on btrfs, XFS
+# and other copy-on-write filesystems.
+FICLONE = 0x40049409
 
+def collect_static_files(source_dir_path, dest_dir_path):
+    files = []
+    for filename in sorted(os.listdir(source_dir_path)):
+        from_path = os.path.join(source_dir_path, filename)
+        dest_path = os.path.join(dest_dir_path, filename)
         if os.path.isfile(from_path):
-            shutil.copy(from_path, dest_path)
-        else: 
-            copy_files_recursive(from_path, dest_path)
+            files.append((from_path, dest_path))
+        else:
+            files.extend(collect_static_files(from_path, dest_path))
+    return files
+
+def copy_files_incremental(source_dir_path, dest_dir_path, manifest, hardlink=False, verbose=False,
+                           fingerprint=False):
+    # With fingerprint, each file is copied to name.<hash>.ext instead (see
+    # assets), and a copy whose source changed is replaced by a new name.
+    old_files = manifest["static"]
+    new_files = {}
+    files = collect_static_files(source_dir_path, dest_dir_path)
+    copies = []
+    for from_path, dest_path in files:
+        if fingerprint:
+            entry = source_entry(from_path, old_files.get(from_path))
+            entry["dest"] = fingerprinted_path(dest_path, entry["hash"])
+        else:
+            entry = _static_entry(from_path, dest_path)
+        if _needs_copy(from_path, entry["dest"], entry):
+            copies.append((from_path, entry["dest"]))
+        new_files[from_path] = entry
+
+    _copy_all(copies, hardlink, verbose)
+
+    for from_path, old_entry in old_files.items():
+        new_entry = new_files.get(from_path)
+        if new_entry is None or new_entry["dest"] != old_entry["dest"]:
+            if verbose:
+                print(f" * removing {old_entry['dest']}")
+            remove_output(old_entry["dest"], dest_dir_path)
+
+    manifest["static"] = new_files
+    print(f" * {len(copies)} of {len(files)} static files updated")
+    return len(copies)
+
+def update_static_files(from_paths, source_dir_path, dest_dir_path, manifest, hardlink=False, verbose=True):
+    files = manifest["static"]
+    copies = []
+    for from_path in from_paths:
+        old_entry = files.get(from_path)
+        if not os.path.isfile(from_path):
+            if old_entry is not None:
+                if verbose:
+                    print(f" * removing {old_entry['dest']}")
+                remove_output(old_entry["dest"], dest_dir_path)
+                del files[from_path]
+            continue
+        dest_path = os.path.join(dest_dir_path, os.path.relpath(from_path, source_dir_path))
+        entry = _static_entry(from_path, dest_path)
+        if _needs_copy(from_path, dest_path, entry):
+            copies.append((from_path, dest_path))
+        files[from_path] = entry
+    _copy_all(copies, hardlink, verbose)
+    return len(copies)
+
+def _static_entry(from_path, dest_path):
+    stat = os.stat(from_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "dest": dest_path}
+
+def _needs_copy(from_path, dest_path, entry):
+    # Copies keep the source mtime, so an up-to-date output has the same size
+    # and mtime as its source; a hardlinked output is the source itself.
+    try:
+        dest_stat = os.stat(dest_path)
+    except FileNotFoundError:
+        return True
+    return dest_stat.st_size != entry["size"] or dest_stat.st_mtime_ns != entry["mtime_ns"]
+
+def _copy_all(copies, hardlink, verbose):
+    if not copies:
+        return
+    for dir_path in sorted({os.path.dirname(dest_path) for _, dest_path in copies}):
+        os.makedirs(dir_path, exist_ok=True)
+    if len(copies) == 1:
+        methods = [fast_copy(copies[0][0], copies[0][1], hardlink)]
+    else:
+        with ThreadPoolExecutor() as executor:
+            methods = list(executor.map(lambda pair: fast_copy(pair[0], pair[1], hardlink), copies))
+    if verbose:
+        for (from_path, dest_path), method in zip(copies, methods):
+            print(f" * {from_path} -> {dest_path} ({method})")
+
+def fast_copy(from_path, dest_path, hardlink=False):
+    # Never write through an existing output: it may be a hardlink to the
+    # source from an earlier build.
+    if os.path.lexists(dest_path):
+        os.remove(dest_path)
+    if hardlink:
+        try:
+            os.link(from_path, dest_path)
+            return "hardlink"
+        except OSError:
+            pass
+    with open(from_path, "rb") as src, open(dest_path, "wb") as dst:
+        method = _clone_or_copy(src, dst)
+    shutil.copystat(from_path, dest_path)
+    return method
 
+def _clone_or_copy(src, dst):
+    if fcntl is not None:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            return "reflink"
+        except OSError:
+            pass
+    if hasattr(os, "copy_file_range"):
+        try:
+            size = os.fstat(src.fileno()).st_size
+            offset = 0
+            while offset < size:
+                copied = os.copy_file_range(src.fileno(), dst.fileno(), size - offset, offset, offset)
+                if copied == 0:
+                    break
+                offset += copied
+            if offset == size:
+                return "copy_file_range"
+        except OSError:
+            pass
+        src.seek(0)
+        dst.seek(0)
+        dst.truncate()
+    shutil.copyfileobj(src, dst, 1 << 20)
+    return "copy"
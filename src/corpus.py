@@ -0,0 +1,140 @@
+import argparse
+import os
+import random
+
+WORDS = (
+    "the ring of power was forged in the fires of mount doom by sauron "
+    "while elves and dwarves and men wandered middle earth seeking lore"
+).split()
+
+# Relative weights of each block kind in a generated page.
+DEFAULT_MIX = {
+    "heading": 15,
+    "paragraph": 38,
+    "ulist": 20,
+    "olist": 10,
+    "quote": 7,
+    "code": 6,
+    "image": 4,
+}
+
+# Fraction of paragraph words that carry each inline construct.
+DEFAULT_INLINE = {
+    "bold": 0.04,
+    "italic": 0.04,
+    "code": 0.02,
+    "link": 0.04,
+    "image": 0.0,
+}
+
+
+def inline_text(rng, words, inline=DEFAULT_INLINE):
+    parts = []
+    for i in range(words):
+        word = rng.choice(WORDS)
+        roll = rng.random()
+        for kind, share in inline.items():
+            if roll < share:
+                word = _decorate(kind, word, i)
+                break
+            roll -= share
+        parts.append(word)
+    return " ".join(parts)
+
+
+def _decorate(kind, word, i):
+    if kind == "bold":
+        return f"**{word}**"
+    if kind == "italic":
+        return f"_{word}_"
+    if kind == "code":
+        return f"`{word}`"
+    if kind == "link":
+        return f"[{word}](/blog/{word}{i})"
+    return f"![{word}](/images/{word}{i}.png)"
+
+
+def synthetic_block(rng, kind, inline=DEFAULT_INLINE):
+    if kind == "heading":
+        return "#" * rng.randint(2, 4) + " " + inline_text(rng, 6, inline)
+    if kind == "ulist":
+        return "\n".join("- " + inline_text(rng, 12, inline) for _ in range(rng.randint(2, 8)))
+    if kind == "olist":
+        return "\n".join(f"{i}. " + inline_text(rng, 12, inline) for i in range(1, rng.randint(3, 9)))
+    if kind == "quote":
+        return "\n".join("> " + inline_text(rng, 15, inline) for _ in range(rng.randint(1, 4)))
+    if kind == "code":
+        return "```\n" + "\n".join(inline_text(rng, 8, {}) for _ in range(4)) + "\n```"
+    if kind == "image":
+        return f"![figure](/images/figure{rng.randrange(100)}.png)"
+    if kind == "paragraph":
+        return inline_text(rng, rng.randint(40, 120), inline)
+    raise ValueError(f"unknown block kind: {kind}")
+
+
+def synthetic_page(rng, page_bytes, mix=DEFAULT_MIX, inline=DEFAULT_INLINE):
+    kinds = list(mix)
+    weights = [mix[kind] for kind in kinds]
+    blocks = [f"# Page {rng.randrange(1 << 30)}"]
+    size = len(blocks[0])
+    while size < page_bytes:
+        block = synthetic_block(rng, rng.choices(kinds, weights)[0], inline)
+        blocks.append(block)
+        size += len(block) + 2
+    return "\n\n".join(blocks)
+
+
+def write_corpus(root, pages, page_bytes, mix=DEFAULT_MIX, inline=DEFAULT_INLINE, seed=0):
+    rng = random.Random(seed)
+    paths = []
+    for page in range(pages):
+        path = os.path.join(root, f"section{page % 50}", f"page{page}", "index.md")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(synthetic_page(rng, page_bytes, mix, inline))
+        paths.append(path)
+    return paths
+
+
+def parse_weights(text, defaults):
+    # "heading=20,code=0" -> defaults with those entries replaced
+    weights = dict(defaults)
+    if not text:
+        return weights
+    for item in text.split(","):
+        name, _, value = item.partition("=")
+        if name not in defaults:
+            raise ValueError(f"unknown mix entry: {name}")
+        weights[name] = float(value)
+    return weights
+
+
+def add_corpus_arguments(parser, pages=200, page_kb=16):
+    parser.add_argument("--pages", type=int, default=pages)
+    parser.add_argument("--page-kb", type=float, default=page_kb)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mix", default="", help="block weights, e.g. heading=20,code=0")
+    parser.add_argument("--inline", default="", help="inline shares, e.g. link=0.2,bold=0")
+
+
+def corpus_options(args):
+    return {
+        "pages": args.pages,
+        "page_bytes": int(args.page_kb * 1000),
+        "mix": parse_weights(args.mix, DEFAULT_MIX),
+        "inline": parse_weights(args.inline, DEFAULT_INLINE),
+        "seed": args.seed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a deterministic synthetic markdown corpus")
+    parser.add_argument("dest")
+    add_corpus_arguments(parser)
+    args = parser.parse_args()
+    paths = write_corpus(args.dest, **corpus_options(args))
+    print(f"Wrote {len(paths)} pages to {args.dest}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+class DepGraph():
+    # What each page was built from, kept in the manifest between runs.
+    # Edges go from a page source to a dependency of some kind, with the
+    # dependency's fingerprint at build time:
+    #   template:          the template the page was rendered with (its
+    #                      digest, which covers partials and asset URLs)
+    #   partial:           partials the template includes (content hash)
+    #   member:            pages a listing page lists (their source hash)
+    #   asset:             root-relative URLs the page references (the URL
+    #                      each was rewritten to, see assets.AssetMap)
+    #   image:             image URLs the page shows (the attributes they
+    #                      were given, see images.ImageTable.fingerprint)
+    # A page is out of date exactly when a recorded fingerprint no longer
+    # matches, so a change invalidates only the pages that used it.
+    def __init__(self, edges=None):
+        self.edges = edges if edges is not None else {}
+
+    def set_dependencies(self, node, kind, deps):
+        # deps is {dep: fingerprint}; replaces the node's edges of this kind.
+        edges = self.edges.setdefault(node, {})
+        edges[kind] = dict(deps)
+
+    def dependencies(self, node, kind):
+        return self.edges.get(node, {}).get(kind, {})
+
+    def remove(self, node):
+        self.edges.pop(node, None)
+
+    def retain(self, nodes):
+        for node in [node for node in self.edges if node not in nodes]:
+            self.remove(node)
+
+    def is_stale(self, node, current):
+        # current is {kind: {dep: fingerprint}} as of now. True when the node
+        # was built from a different set of dependencies or fingerprints for
+        # any of those kinds, or has no record of them at all.
+        kinds = self.edges.get(node, {})
+        return any(kinds.get(kind) != deps for kind, deps in current.items())
+
+    def to_dict(self):
+        return self.edges
+
+    @classmethod
+    def from_dict(cls, edges):
+        return cls({node: {kind: dict(deps) for kind, deps in kinds.items()} for node, kinds in edges.items()})
+
+    def __repr__(self):
+        return f"DepGraph({len(self.edges)} nodes)"
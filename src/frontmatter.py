@@ -0,0 +1,89 @@
+import re
+
+# A page may start with a block of "key: value" (YAML style, fenced by ---)
+# or "key = value" (TOML style, fenced by +++) lines. Only flat keys with
+# scalar or inline-list values are supported; that covers titles, dates,
+# summaries and tags without pulling in a YAML or TOML library. A block that
+# is not closed, or holds anything else, is not front matter: it stays part
+# of the body, so a page may open with a thematic break.
+DELIMITERS = {"---": ":", "+++": "="}
+
+_KEY = re.compile(r"[A-Za-z_][\w-]*$")
+_NUMBER = re.compile(r"-?\d+(\.\d+)?$")
+
+
+def split_front_matter(markdown):
+    # Returns (front_matter, body). Text without front matter comes back
+    # unchanged with an empty dict.
+    delimiter = markdown[:3]
+    if delimiter not in DELIMITERS or markdown[3:4] not in ("\n", "\r"):
+        return {}, markdown
+    lines = iter(markdown.splitlines(keepends=True))
+    parsed = _read_lines(lines)
+    if parsed is None:
+        return {}, markdown
+    front_matter, consumed = parsed
+    return front_matter, markdown[consumed:]
+
+
+def read_front_matter(from_file):
+    # Reads the front matter from an open text file one line at a time and
+    # leaves the file positioned at the start of the body, so the body is
+    # never read unless the caller goes on to iterate the file.
+    start = from_file.tell()
+    first = from_file.readline()
+    parsed = None
+    if first.rstrip("\r\n") in DELIMITERS:
+        parsed = _read_lines(_chain(first, iter(from_file.readline, "")))
+    if parsed is None:
+        from_file.seek(start)
+        return {}
+    return parsed[0]
+
+
+def read_front_matter_path(path):
+    with open(path, "r") as from_file:
+        return read_front_matter(from_file)
+
+
+def _chain(first, lines):
+    yield first
+    yield from lines
+
+
+def _read_lines(lines):
+    # Returns (front_matter, characters consumed), or None when the lines
+    # are not a front matter block.
+    first = next(lines)
+    consumed = len(first)
+    delimiter = first.rstrip("\r\n")
+    separator = DELIMITERS[delimiter]
+    front_matter = {}
+    for line in lines:
+        consumed += len(line)
+        stripped = line.strip()
+        if stripped == delimiter:
+            return front_matter, consumed
+        if stripped == "":
+            continue
+        key, sep, value = stripped.partition(separator)
+        key = key.strip()
+        if sep == "" or not _KEY.match(key):
+            return None
+        front_matter[key] = parse_value(value.strip())
+    return None
+
+
+def parse_value(value):
+    if value.startswith("[") and value.endswith("]"):
+        inner = value[1:-1].strip()
+        if inner == "":
+            return []
+        return [parse_value(item.strip()) for item in inner.split(",")]
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    if value in ("true", "false"):
+        return value == "true"
+    if _NUMBER.match(value):
+        return float(value) if "." in value else int(value)
+    return value
@@ -1,46 +1,490 @@
 import os
-from block_markdown import markdown_to_html_node
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import astcache
+import inlinecache
+import rendercache
+import siteindex
+from depgraph import DepGraph
+from block_markdown import block_to_html_node, iter_markdown_blocks, markdown_to_html_node
+from frontmatter import read_front_matter, read_front_matter_path, split_front_matter
+from images import apply_images
+from manifest import hash_file, remove_output, replace_if_changed, source_entry, temp_path, write_if_changed
+from pagemeta import PageMeta, find_title
 from pathlib import Path
+from template import load_template
+import profiler
+from profiler import stage
 
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath):
-    for filename in os.listdir(dir_path_content):
+# Sources at least this large are streamed block by block instead of being
+# read, parsed and rendered whole.
+stream_threshold = 8 * 1024 * 1024
+
+def collect_pages(dir_path_content, dest_dir_path):
+    pages = []
+    for filename in sorted(os.listdir(dir_path_content)):
         from_path = os.path.join(dir_path_content, filename)
         dest_path = os.path.join(dest_dir_path, filename)
         if os.path.isfile(from_path):
-            dest_path = Path(dest_path).with_suffix(".html")
-            generate_page(from_path, template_path, dest_path, basepath)
+            pages.append((from_path, str(Path(dest_path).with_suffix(".html"))))
+        else:
+            pages.extend(collect_pages(from_path, dest_path))
+    return pages
+
+def page_dest_path(dir_path_content, dest_dir_path, from_path):
+    rel_path = os.path.relpath(from_path, dir_path_content)
+    return str(Path(os.path.join(dest_dir_path, rel_path)).with_suffix(".html"))
+
+def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath, jobs=1, cache_dir=None,
+                             io_threads=0, images=None, assets=None):
+    pages = collect_pages(dir_path_content, dest_dir_path)
+    return generate_pages(pages, template_path, basepath, jobs, cache_dir, io_threads, images, assets)
+
+def generate_pages(pages, template_path, basepath, jobs=1, cache_dir=None, io_threads=0, images=None, assets=None):
+    # Returns {from_path: PageMeta} for the pages generated. Worker
+    # processes (jobs) take precedence over the threaded I/O pipeline.
+    # images is the images.ImageTable that <img> attributes come from.
+    metas = {}
+    if jobs <= 1 and io_threads > 0 and len(pages) > 1:
+        return generate_pages_pipelined(pages, template_path, basepath, cache_dir, io_threads, images, assets)
+    if jobs <= 1 or len(pages) < 2:
+        for from_path, dest_path in pages:
+            metas[from_path] = generate_page(from_path, template_path, dest_path, basepath, cache_dir,
+                                             images=images, assets=assets)
+        return metas
+
+    # Workers render and write; results come back in page order so the log
+    # and the error report are the same on every run.
+    profile = profiler.is_enabled()
+    inline_entries = inlinecache.max_entries()
+    job_args = [
+        (from_path, template_path, dest_path, basepath, cache_dir, images, assets, profile, inline_entries)
+        for from_path, dest_path in pages
+    ]
+    chunksize = max(1, len(pages) // (jobs * 4))
+    failures = []
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        results = executor.map(_generate_page_job, job_args, chunksize=chunksize)
+        for (from_path, dest_path), (error, record, meta, inline_counts) in zip(pages, results):
+            print(f" * {from_path} {template_path} -> {dest_path}")
+            profiler.add_record(record)
+            inlinecache.add_counts(inline_counts)
+            if error is not None:
+                failures.append(f"{from_path}: {error}")
+            else:
+                metas[from_path] = meta
+    if failures:
+        raise ValueError(f"failed to generate {len(failures)} page(s):\n" + "\n".join(failures))
+    return metas
+
+def generate_pages_pipelined(pages, template_path, basepath, cache_dir=None, io_threads=4, images=None,
+                             assets=None):
+    # Reads run ahead of rendering and writes trail behind it on a thread
+    # pool, so on high-latency filesystems the I/O of neighbouring pages
+    # overlaps with rendering. At most 2 * io_threads reads and as many
+    # writes are in flight; the reader waits for the oldest write when the
+    # window is full, which bounds memory to a few pages.
+    metas = {}
+    window = 2 * io_threads
+    pending = iter(pages)
+    reads = deque()
+    writes = deque()
+    with ThreadPoolExecutor(max_workers=io_threads) as executor:
+        def read_ahead():
+            while len(reads) < window:
+                page = next(pending, None)
+                if page is None:
+                    return
+                reads.append((page, executor.submit(_read_source, page[0])))
+
+        read_ahead()
+        while reads:
+            (from_path, dest_path), future = reads.popleft()
+            read_ahead()
+            print(f" * {from_path} {template_path} -> {dest_path}")
+            profiler.start_page(from_path)
+            try:
+                markdown_content = future.result()
+                if markdown_content is None:
+                    metas[from_path] = stream_page(from_path, template_path, dest_path, basepath, images, assets)
+                    continue
+                html, meta = render_markdown(markdown_content, template_path, basepath, cache_dir, images, assets)
+                data = html.encode("utf-8")
+                profiler.add_bytes(len(data))
+            finally:
+                profiler.add_record(profiler.finish_page())
+            metas[from_path] = meta
+            writes.append(executor.submit(write_if_changed, dest_path, data))
+            while len(writes) > window:
+                writes.popleft().result()
+        while writes:
+            writes.popleft().result()
+    return metas
+
+def _read_source(from_path):
+    # Runs on a pipeline thread, so it stays out of the profiler, which
+    # tracks the page being rendered on the main thread. Sources that would
+    # be streamed are left for the main thread.
+    if os.path.getsize(from_path) >= stream_threshold:
+        return None
+    with open(from_path, "r") as from_file:
+        return from_file.read()
+
+def _generate_page_job(args):
+    from_path, template_path, dest_path, basepath, cache_dir, images, assets, profile, inline_entries = args
+    if profile:
+        profiler.enable()
+    # The memo lives for the whole worker process; each job reports only
+    # what it added to the counts.
+    if inlinecache.max_entries() != inline_entries:
+        inlinecache.enable(inline_entries)
+    before = inlinecache.counts()
+    profiler.start_page(from_path)
+    try:
+        meta = build_page(from_path, template_path, dest_path, basepath, cache_dir, images=images, assets=assets)
+    except Exception as e:
+        meta = None
+        error = f"{type(e).__name__}: {e}"
+    else:
+        error = None
+    inline_counts = [after - start for after, start in zip(inlinecache.counts(), before)]
+    return error, profiler.finish_page(), meta, inline_counts
+
+def generate_pages_incremental(dir_path_content, template_path, dest_dir_path, basepath, manifest, jobs=1,
+                               cache_dir=None, index=None, io_threads=0, images=None, assets=None):
+    # With an index (see siteindex), every page's metadata is kept in it, and
+    # listing pages are rendered last from index queries. The dependency
+    # graph in the manifest decides which pages a template, partial, image or
+    # listed page change reaches.
+    graph = DepGraph.from_dict(manifest["deps"])
+    template_deps = template_dependencies(template_path, basepath, assets)
+    rebuild_all = manifest["basepath"] != basepath
+    indexed = siteindex.page_hashes(index) if index is not None else {}
+
+    old_pages = manifest["pages"]
+    new_pages = {}
+    stale = []
+    for from_path, dest_path in collect_pages(dir_path_content, dest_dir_path):
+        old_entry = old_pages.get(from_path)
+        entry = source_entry(from_path, old_entry)
+        entry["dest"] = dest_path
+        if (
+            rebuild_all
+            or _page_is_stale(old_entry, entry)
+            or graph.is_stale(from_path, template_deps)
+            or graph.is_stale(from_path, _url_dependencies(graph, from_path, images, assets))
+            or (index is not None and indexed.get(from_path) != entry["hash"])
+        ):
+            stale.append((from_path, dest_path))
+        new_pages[from_path] = entry
+
+    listings = []
+    if index is not None:
+        stale, listings = _split_listings(stale)
+    metas = generate_pages(stale, template_path, basepath, jobs, cache_dir, io_threads, images, assets)
+    _record_dependencies(graph, metas, template_deps, images, assets)
+
+    for from_path, old_entry in old_pages.items():
+        if from_path not in new_pages:
+            print(f" * removing {old_entry['dest']}")
+            remove_output(old_entry["dest"], dest_dir_path)
+    graph.retain(new_pages)
+
+    generated = len(stale)
+    if index is not None:
+        generated += _update_index(index, graph, template_deps, metas, new_pages, listings, dir_path_content,
+                                   template_path, dest_dir_path, basepath, cache_dir, images, assets)
+
+    manifest["basepath"] = basepath
+    manifest["pages"] = new_pages
+    manifest["deps"] = graph.to_dict()
+    return generated
+
+def update_pages(from_paths, dir_path_content, template_path, dest_dir_path, basepath, manifest, cache_dir=None,
+                 index=None, images=None, assets=None):
+    # Targeted variant of generate_pages_incremental for callers that already
+    # know which sources changed, such as the watcher.
+    pages = manifest["pages"]
+    graph = DepGraph.from_dict(manifest["deps"])
+    template_deps = template_dependencies(template_path, basepath, assets)
+    stale = []
+    for from_path in from_paths:
+        old_entry = pages.get(from_path)
+        if not os.path.isfile(from_path):
+            if old_entry is not None:
+                print(f" * removing {old_entry['dest']}")
+                remove_output(old_entry["dest"], dest_dir_path)
+                del pages[from_path]
+                graph.remove(from_path)
+            continue
+        entry = source_entry(from_path, old_entry)
+        entry["dest"] = page_dest_path(dir_path_content, dest_dir_path, from_path)
+        if _page_is_stale(old_entry, entry):
+            stale.append((from_path, entry["dest"]))
+        pages[from_path] = entry
+
+    listings = []
+    if index is not None:
+        stale, listings = _split_listings(stale)
+    metas = {}
+    for from_path, dest_path in stale:
+        metas[from_path] = generate_page(from_path, template_path, dest_path, basepath, cache_dir, images=images,
+                                         assets=assets)
+    _record_dependencies(graph, metas, template_deps, images, assets)
+    generated = len(stale)
+    if index is not None:
+        generated += _update_index(index, graph, template_deps, metas, pages, listings, dir_path_content,
+                                   template_path, dest_dir_path, basepath, cache_dir, images, assets)
+    manifest["deps"] = graph.to_dict()
+    return generated
+
+def template_dependencies(template_path, basepath, assets=None):
+    # The template's digest covers its partials and the asset URLs it
+    # was rendered with, so a fingerprinted stylesheet reaches every page.
+    template = load_template(template_path, basepath, assets)
+    return {
+        "template": {template_path: template.digest},
+        "partial": {path: hash_file(path) for path in template.partials},
+    }
+
+def _record_dependencies(graph, metas, template_deps, images=None, assets=None):
+    for from_path, meta in metas.items():
+        for kind, deps in template_deps.items():
+            graph.set_dependencies(from_path, kind, deps)
+        links = [href for href in meta.links if href.startswith("/")]
+        srcs = [src for src, _ in meta.images if src.startswith("/")]
+        graph.set_dependencies(from_path, "asset", {url: _asset_url(assets, url) for url in links + srcs})
+        # Images are looked up by the URL the page ends up with.
+        rendered = [_asset_url(assets, src) for src, _ in meta.images]
+        graph.set_dependencies(from_path, "image", {src: _image_fingerprint(images, src) for src in rendered})
+
+def _url_dependencies(graph, from_path, images, assets):
+    # The URLs and image attributes the page would get now, to compare with
+    # the ones it was rendered with.
+    return {
+        "asset": {url: _asset_url(assets, url) for url in graph.dependencies(from_path, "asset")},
+        "image": {src: _image_fingerprint(images, src) for src in graph.dependencies(from_path, "image")},
+    }
+
+def _asset_url(assets, url):
+    return assets.url(url) if assets is not None else url
+
+def _image_fingerprint(images, src):
+    return images.fingerprint(src) if images is not None else None
+
+def _split_listings(pages):
+    # A page whose front matter has "listing: <section>" (or "listing:
+    # tag:<tag>") is rendered after the index is up to date. Peeking at the
+    # front matter reads only the head of each changed page.
+    regular = []
+    listings = []
+    for from_path, dest_path in pages:
+        listing = read_front_matter_path(from_path).get("listing")
+        if listing is None:
+            regular.append((from_path, dest_path))
         else:
-            generate_pages_recursive(from_path, template_path, dest_path, basepath)
+            listings.append((from_path, dest_path, str(listing)))
+    return regular, listings
+
+def _update_index(index, graph, template_deps, metas, pages, listings, dir_path_content, template_path,
+                  dest_dir_path, basepath, cache_dir, images=None, assets=None):
+    # Returns the number of listing pages rendered.
+    for from_path, meta in metas.items():
+        entry = pages[from_path]
+        url = siteindex.page_url(entry["dest"], dest_dir_path)
+        siteindex.update_page(index, from_path, entry["dest"], url, entry, meta)
+    siteindex.retain(index, pages)
 
-def generate_page(from_path, template_path, dest_path, basepath):
+    # A listing page that did not change itself is rendered again only when
+    # the pages it lists, or their sources, differ from its last render.
+    pending = {from_path for from_path, _, _ in listings}
+    for from_path, dest_path, listing in siteindex.listing_pages(index):
+        if from_path not in pending and from_path in pages:
+            listings.append((from_path, dest_path, listing))
+    rendered = 0
+    for from_path, dest_path, listing in sorted(listings):
+        rows = _listing_rows(index, listing, dir_path_content)
+        members = {row[0]: pages[row[0]]["hash"] for row in rows}
+        if from_path not in pending and not graph.is_stale(from_path, {"member": members}):
+            continue
+        meta = generate_page(from_path, template_path, dest_path, basepath, cache_dir, rows, images, assets)
+        graph.set_dependencies(from_path, "member", members)
+        _record_dependencies(graph, {from_path: meta}, template_deps, images, assets)
+        entry = pages[from_path]
+        url = siteindex.page_url(dest_path, dest_dir_path)
+        siteindex.update_page(index, from_path, dest_path, url, entry, meta)
+        rendered += 1
+    index.commit()
+    return rendered
+
+def _listing_rows(index, listing, dir_path_content):
+    if listing.startswith("tag:"):
+        return siteindex.tagged_pages(index, listing[len("tag:"):])
+    return siteindex.section_pages(index, os.path.join(dir_path_content, listing))
+
+def _page_is_stale(old_entry, entry):
+    return (
+        old_entry is None
+        or old_entry["hash"] != entry["hash"]
+        or old_entry["dest"] != entry["dest"]
+        or not os.path.exists(entry["dest"])
+    )
+
+def generate_page(from_path, template_path, dest_path, basepath, cache_dir=None, listing=None, images=None,
+                  assets=None):
     print(f" * {from_path} {template_path} -> {dest_path}")
-    from_file = open(from_path, "r")
-    markdown_content = from_file.read()
-    from_file.close()
+    profiler.start_page(from_path)
+    try:
+        return build_page(from_path, template_path, dest_path, basepath, cache_dir, listing, images, assets)
+    finally:
+        profiler.add_record(profiler.finish_page())
+
+def build_page(from_path, template_path, dest_path, basepath, cache_dir=None, listing=None, images=None,
+               assets=None):
+    if not listing and os.path.getsize(from_path) >= stream_threshold:
+        return stream_page(from_path, template_path, dest_path, basepath, images, assets)
+    html, meta = render_page_meta(from_path, template_path, basepath, cache_dir, listing, images, assets)
+    write_page(dest_path, html)
+    return meta
+
+def render_page(from_path, template_path, basepath, cache_dir=None):
+    return render_page_meta(from_path, template_path, basepath, cache_dir)[0]
 
-    template_file = open(template_path, "r")
-    template = template_file.read()
-    template_file.close()
+def render_page_meta(from_path, template_path, basepath, cache_dir=None, listing=None, images=None,
+                     assets=None):
+    with stage("read"):
+        with open(from_path, "r") as from_file:
+            markdown_content = from_file.read()
+    return render_markdown(markdown_content, template_path, basepath, cache_dir, images, assets, listing)
 
-    node = markdown_to_html_node(markdown_content)
-    html = node.to_html()
+def render_markdown(markdown_content, template_path, basepath, cache_dir=None, images=None, assets=None,
+                    listing=None):
+    # listing holds the index rows a listing page lists; they are appended
+    # to the page as a list built from nodes, never parsed as markdown.
+    # With a cache_dir, a page rendered before from the same markdown,
+    # template, basepath, image table and generator code is taken from the render cache
+    # (see rendercache); otherwise from the parse cache, or parsed afresh.
+    template = load_template(template_path, basepath, assets)
+    key = None
+    if cache_dir is not None:
+        with stage("cache"):
+            key = rendercache.cache_key(markdown_content, template, basepath, images, assets, listing)
+            cached = rendercache.load(cache_dir, key)
+        if cached is not None:
+            return cached
 
-    title = extract_title(markdown_content)
-    template = template.replace("{{ Title }}", title)
-    template = template.replace("{{ Content }}", html)
-    template = template.replace('href="/', 'href="' + basepath)
-    template = template.replace('src = "/', 'src = "' + basepath)
+    node, meta = parse_page(markdown_content, cache_dir)
+    if listing:
+        node.children.append(siteindex.listing_node(listing))
+        meta.links.extend(url for _, url, _, _, _ in listing)
+    apply_basepath(node, basepath, assets)
+    apply_images(node, images)
 
-    dest_dir_path = os.path.dirname(dest_path)
-    if dest_dir_path != "":
-        os.makedirs(dest_dir_path, exist_ok=True)
+    with stage("serialize"):
+        content = node.to_html()
 
-    to_file = open(dest_path, "w")
-    to_file.write(template)
+    with stage("template"):
+        html = template.render({"Title": meta.require_title(), "Content": content})
+
+    if key is not None:
+        with stage("cache"):
+            rendercache.store(cache_dir, key, html, meta)
+    return html, meta
+
+def parse_page(markdown_content, cache_dir=None):
+    # Returns (node, meta); the metadata is the front matter plus what the
+    # parse collects while building the tree. The cached tree is stored
+    # before apply_basepath touches it, so template and basepath changes can
+    # reuse it.
+    key = None
+    if cache_dir is not None:
+        with stage("cache"):
+            key = astcache.cache_key(markdown_content)
+            cached = astcache.load(cache_dir, key)
+        if cached is not None:
+            return cached
+
+    with stage("parse"):
+        front_matter, body = split_front_matter(markdown_content)
+        meta = PageMeta(front_matter=front_matter)
+        node = markdown_to_html_node(body, meta)
+
+    if key is not None:
+        with stage("cache"):
+            astcache.store(cache_dir, key, (node, meta))
+    return node, meta
+
+def apply_basepath(node, basepath, assets=None):
+    # Root-relative links in the content get the basepath, and references to
+    # fingerprinted assets their new URL, on the node tree, so the rendered
+    # page never needs a second pass over its HTML.
+    if basepath == "/" and assets is None:
+        return
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node.children is not None:
+            stack.extend(node.children)
+        elif node.props is not None:
+            href = node.props.get("href")
+            if href is not None and href.startswith("/"):
+                node.props["href"] = basepath + _asset_url(assets, href)[1:]
+            src = node.props.get("src")
+            if assets is not None and src is not None and src.startswith("/"):
+                node.props["src"] = assets.url(src)
+
+def stream_page(from_path, template_path, dest_path, basepath, images=None, assets=None):
+    # Peak memory is bounded by the largest block: the title comes from a
+    # line scan, since the template needs it before the content, then blocks
+    # are parsed and serialized straight to the file.
+    template = load_template(template_path, basepath, assets)
+    with open(from_path, "r") as from_file:
+        meta = PageMeta(front_matter=read_front_matter(from_file))
+        if meta.title is None:
+            meta.title = extract_title_lines(from_file)
+        title = meta.title
+
+    def write_content(write):
+        write("<div>")
+        with open(from_path, "r") as from_file:
+            read_front_matter(from_file)
+            for block in iter_markdown_blocks(from_file):
+                node = block_to_html_node(block, meta)
+                apply_basepath(node, basepath, assets)
+                apply_images(node, images)
+                node.write_chunks(write)
+        write("</div>")
+
+    with stage("stream"):
+        dest_dir_path = os.path.dirname(dest_path)
+        if dest_dir_path != "":
+            os.makedirs(dest_dir_path, exist_ok=True)
+        tmp_path = temp_path(dest_path)
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as to_file:
+                template.stream(to_file.write, {"Title": title, "Content": write_content})
+                profiler.add_bytes(to_file.tell())
+            replace_if_changed(tmp_path, dest_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    return meta
+
+def write_page(dest_path, html):
+    # Returns False when the existing output already had these bytes.
+    with stage("write"):
+        data = html.encode("utf-8")
+        profiler.add_bytes(len(data))
+        return write_if_changed(dest_path, data)
 
 def extract_title(md):
-    lines = md.split("\n")
+    title = find_title(md)
+    if title is None:
+        raise ValueError("no title found")
+    return title
+
+def extract_title_lines(lines):
     for line in lines:
         if line.startswith("# "):
-            return line[2:]
+            return line[2:].removesuffix("\n")
     raise ValueError("no title found")
@@ -1,4 +1,9 @@
+_DONE = object()
+
+
 class HTMLNode():
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
@@ -6,21 +11,36 @@ class HTMLNode():
         self.props = props
 
     def to_html(self):
-        raise NotImplementedError("to_html method not implemented")
+        parts = []
+        self.write_chunks(parts.append)
+        return "".join(parts)
+
+    def write_html(self, fp):
+        self.write_chunks(fp.write)
+
+    def iter_html(self):
+        raise NotImplementedError("iter_html method not implemented")
+
+    def write_chunks(self, write):
+        # Serializers hand each chunk to `write` in document order instead of
+        # concatenating subtrees, so no level of the tree copies its children.
+        raise NotImplementedError("write_chunks method not implemented")
 
     def props_to_html(self):
         if self.props is None:
             return ""
-        props_html = ""
-        for prop in self.props:
-            props_html += f' {prop}="{self.props[prop]}"'
-        return props_html
+        return "".join([f' {prop}="{value}"' for prop, value in self.props.items()])
+
+    def __reduce__(self):
+        return (HTMLNode, (self.tag, self.value, self.children, self.props))
 
     def __repr__(self):
         return f"HTMLNode({self.tag}, {self.value}, children: {self.children}, {self.props})"
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
         super().__init__(tag, value, None, props)
 
@@ -31,23 +51,71 @@ class LeafNode(HTMLNode):
             return self.value
         return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
 
+    def iter_html(self):
+        yield self.to_html()
+
+    def write_chunks(self, write):
+        write(self.to_html())
+
+    def __reduce__(self):
+        return (LeafNode, (self.tag, self.value, self.props))
+
     def __repr__(self):
         return f"LeafNode({self.tag}, {self.value}, {self.props})"
 
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         super().__init__(tag, None, children, props)
 
-    def to_html(self):
+    def _check(self):
         if self.tag is None:
             raise ValueError("invalid HTML: no tag")
         if self.children is None:
             raise ValueError("invalid HTML: no children")
-        children_html = ""
-        for child in self.children:
-            children_html += child.to_html()
-        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
+
+    def iter_html(self):
+        # An explicit stack keeps each chunk O(1) to produce; nested
+        # `yield from` would re-yield every chunk through each ancestor.
+        self._check()
+        yield f"<{self.tag}{self.props_to_html()}>"
+        stack = [(self, iter(self.children))]
+        while stack:
+            node, children = stack[-1]
+            child = next(children, _DONE)
+            if child is _DONE:
+                stack.pop()
+                yield f"</{node.tag}>"
+            elif isinstance(child, ParentNode):
+                child._check()
+                yield f"<{child.tag}{child.props_to_html()}>"
+                stack.append((child, iter(child.children)))
+            else:
+                yield from child.iter_html()
+
+    def write_chunks(self, write):
+        # An explicit stack, like iter_html, so deep trees do not hit the
+        # recursion limit; leaves are written without leaving the loop.
+        self._check()
+        write(f"<{self.tag}{self.props_to_html()}>")
+        stack = [(self, iter(self.children))]
+        while stack:
+            node, children = stack[-1]
+            for child in children:
+                if isinstance(child, ParentNode):
+                    child._check()
+                    write(f"<{child.tag}{child.props_to_html()}>")
+                    stack.append((child, iter(child.children)))
+                    break
+                child.write_chunks(write)
+            else:
+                stack.pop()
+                write(f"</{node.tag}>")
+
+    def __reduce__(self):
+        return (ParentNode, (self.tag, self.children, self.props))
 
     def __repr__(self):
         return f"ParentNode({self.tag}, children: {self.children}, {self.props})"
@@ -0,0 +1,239 @@
+import filecmp
+import hashlib
+import json
+import os
+import shutil
+import struct
+from concurrent.futures import ProcessPoolExecutor
+
+from manifest import hash_file, remove_output
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+IMAGE_SUFFIXES = (".png", ".gif", ".jpg", ".jpeg")
+
+# Widths of the responsive variants; only those narrower than the original
+# are made. Changing these or the encoder settings changes every cache key.
+default_widths = (480, 960, 1600)
+VARIANT_SETTINGS = {"jpeg_quality": 82, "optimize": True, "version": 1}
+
+
+class ImageTable():
+    # What the page renderer needs to know about each image in the site:
+    # {url: {"width", "height", "srcset"}}. digest covers the whole table,
+    # so rendered pages can be cached against it.
+    def __init__(self, entries=None):
+        self.entries = entries if entries is not None else {}
+        self.digest = hashlib.sha256(json.dumps(self.entries, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def get(self, url):
+        return self.entries.get(url)
+
+    def fingerprint(self, url):
+        entry = self.entries.get(url)
+        if entry is None:
+            return None
+        return f"{entry['width']}x{entry['height']} {entry.get('srcset', '')}"
+
+    def __repr__(self):
+        return f"ImageTable({len(self.entries)} images)"
+
+
+def image_size(path):
+    # (width, height) read from the file header with the standard library,
+    # so <img> tags get dimensions even without Pillow.
+    with open(path, "rb") as f:
+        head = f.read(26)
+        if head[:8] == b"\x89PNG\r\n\x1a\n" and head[12:16] == b"IHDR":
+            return struct.unpack(">II", head[16:24])
+        if head[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", head[6:10])
+        if head[:2] == b"\xff\xd8":
+            f.seek(2)
+            return _jpeg_size(f)
+    if Image is not None:
+        with Image.open(path) as image:
+            return image.size
+    raise ValueError(f"unknown image format: {path}")
+
+
+def _jpeg_size(f):
+    # Walks the JPEG segments up to the first start-of-frame marker.
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            raise ValueError("invalid JPEG")
+        if marker[1] in (0xD8, 0x01) or 0xD0 <= marker[1] <= 0xD7:
+            continue
+        length = struct.unpack(">H", f.read(2))[0]
+        if 0xC0 <= marker[1] <= 0xCF and marker[1] not in (0xC4, 0xC8, 0xCC):
+            height, width = struct.unpack(">xHH", f.read(5))
+            return width, height
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+def variant_key(source_hash, width, suffix):
+    params = json.dumps({"width": width, "suffix": suffix, **VARIANT_SETTINGS}, sort_keys=True)
+    return hashlib.sha256(f"{source_hash}\n{params}".encode("utf-8")).hexdigest()
+
+
+def variant_dest(dest_path, width):
+    stem, suffix = os.path.splitext(dest_path)
+    return f"{stem}-{width}w{suffix}"
+
+
+def process_images(manifest, dest_dir_path, cache_dir, widths=default_widths, jobs=None, verbose=False,
+                   basepath="/"):
+    # Builds the image table for the static images in the manifest and
+    # writes a resized variant per width next to each copied image. Variants
+    # are made once per source hash and settings into cache_dir and copied
+    # from there, so unchanged images are never reprocessed; new ones are
+    # resized on a process pool, and cached ones no current image uses are
+    # pruned. Without Pillow there are no variants, but the table still has
+    # each image's dimensions. An image whose size cannot be read is left
+    # out with a warning.
+    old_images = manifest["images"]
+    new_images = {}
+    work = []
+    for from_path, static_entry in sorted(manifest["static"].items()):
+        dest_path = static_entry["dest"]
+        if not dest_path.lower().endswith(IMAGE_SUFFIXES):
+            continue
+        old_entry = old_images.get(from_path)
+        if (
+            old_entry is not None
+            and old_entry["size"] == static_entry["size"]
+            and old_entry["mtime_ns"] == static_entry["mtime_ns"]
+        ):
+            entry = dict(old_entry)
+        else:
+            try:
+                width, height = image_size(from_path)
+            except (OSError, ValueError, struct.error) as e:
+                print(f" * warning: skipping {from_path}: {e}")
+                continue
+            entry = {
+                "size": static_entry["size"],
+                "mtime_ns": static_entry["mtime_ns"],
+                "hash": hash_file(from_path),
+                "width": width,
+                "height": height,
+            }
+        entry["url"] = "/" + os.path.relpath(dest_path, dest_dir_path).replace(os.sep, "/")
+        entry["variants"] = []
+        if Image is not None:
+            suffix = os.path.splitext(dest_path)[1].lower()
+            for width in sorted(w for w in widths if w < entry["width"]):
+                cached = os.path.join(cache_dir, variant_key(entry["hash"], width, suffix) + suffix)
+                if not os.path.exists(cached):
+                    work.append((from_path, cached, width))
+                entry["variants"].append([width, variant_dest(dest_path, width), cached])
+        new_images[from_path] = entry
+
+    if work:
+        os.makedirs(cache_dir, exist_ok=True)
+        if len(work) == 1:
+            make_variant(work[0])
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                list(executor.map(make_variant, work))
+
+    for from_path, entry in new_images.items():
+        old_entry = old_images.get(from_path, {"variants": []})
+        old_cached = {dest: cached for _, dest, cached in old_entry["variants"]}
+        for width, dest_path, cached in entry["variants"]:
+            # The cache file name is the variant's key, so an output made
+            # from the same one is up to date; a full build, which has no
+            # record of it, compares the bytes instead.
+            if not os.path.exists(dest_path) or (
+                old_cached.get(dest_path) != cached and not filecmp.cmp(cached, dest_path, shallow=False)
+            ):
+                shutil.copyfile(cached, dest_path)
+                if verbose:
+                    print(f" * {from_path} -> {dest_path} ({width}w)")
+    for from_path, old_entry in old_images.items():
+        old_dests = {dest for _, dest, _ in old_entry["variants"]}
+        new_dests = {dest for _, dest, _ in new_images.get(from_path, {"variants": []})["variants"]}
+        for dest_path in sorted(old_dests - new_dests):
+            remove_output(dest_path, dest_dir_path)
+
+    if Image is not None:
+        prune_cache(cache_dir, {cached for entry in new_images.values() for _, _, cached in entry["variants"]})
+
+    manifest["images"] = new_images
+    print(f" * {len(new_images)} images, {len(work)} variants processed")
+    return image_table(new_images, basepath)
+
+
+def prune_cache(cache_dir, keep):
+    # Variants are named by source hash and settings, so one that is not in
+    # keep belongs to an image that changed or went away.
+    if not os.path.isdir(cache_dir):
+        return
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if path not in keep and os.path.isfile(path):
+            os.remove(path)
+
+
+def remove_variants(manifest, dest_dir_path):
+    # For builds without image processing: variants an earlier build made
+    # are removed, and pages go back to plain <img> tags.
+    for dest_path in image_outputs(manifest):
+        remove_output(dest_path, dest_dir_path)
+    manifest["images"] = {}
+
+
+def image_table(images, basepath="/"):
+    # srcset URLs get the basepath here: apply_images copies them into the
+    # page after apply_basepath has run.
+    entries = {}
+    for entry in images.values():
+        values = {"width": entry["width"], "height": entry["height"]}
+        if entry["variants"]:
+            candidates = [(entry["url"].rsplit("/", 1)[0] + "/" + os.path.basename(dest), width)
+                          for width, dest, _ in entry["variants"]]
+            candidates.append((entry["url"], entry["width"]))
+            values["srcset"] = ", ".join(f"{basepath}{url[1:]} {width}w" for url, width in candidates)
+        entries[entry["url"]] = values
+    return ImageTable(entries)
+
+
+def image_outputs(manifest):
+    return [dest for entry in manifest["images"].values() for _, dest, _ in entry["variants"]]
+
+
+def make_variant(args):
+    from_path, cached_path, width = args
+    with Image.open(from_path) as image:
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.LANCZOS)
+        tmp_path = f"{cached_path}.{os.getpid()}.tmp"
+        options = {"optimize": VARIANT_SETTINGS["optimize"]}
+        if cached_path.endswith((".jpg", ".jpeg")):
+            resized = resized.convert("RGB")
+            options["quality"] = VARIANT_SETTINGS["jpeg_quality"]
+        resized.save(tmp_path, format=image.format, **options)
+    os.replace(tmp_path, cached_path)
+
+
+def apply_images(node, images):
+    # Adds width, height and srcset to the <img> tags whose src is in the
+    # image table, walking the tree like apply_basepath.
+    if images is None:
+        return
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node.children is not None:
+            stack.extend(node.children)
+        elif node.tag == "img" and node.props is not None:
+            values = images.get(node.props.get("src"))
+            if values is not None:
+                node.props["width"] = str(values["width"])
+                node.props["height"] = str(values["height"])
+                if "srcset" in values:
+                    node.props["srcset"] = values["srcset"]
@@ -88,7 +88,9 @@ def split_nodes_link(old_nodes):
 
     return new_nodes
 
-def text_to_textnodes(text):
+def cascade_to_textnodes(text):
+    # The five-pass pipeline text_to_textnodes used before the single-pass
+    # scanner; kept as the reference the scanner is checked against.
     nodes = [TextNode(text, TextType.TEXT)]
     nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
     nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
@@ -97,3 +99,49 @@ def text_to_textnodes(text):
     nodes = split_nodes_link(nodes)
     return nodes
 
+# One alternation covers every inline construct. The scanner below walks it
+# left to right once, so each character is examined a constant number of times.
+_INLINE_TOKEN = re.compile(
+    r"(\*\*|_|`)"
+    r"|!\[([^\[\]]*)\]\(([^\(\)]*)\)"
+    r"|(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)"
+)
+
+_DELIMITER_TYPES = {
+    "**": TextType.BOLD,
+    "_": TextType.ITALIC,
+    "`": TextType.CODE,
+}
+
+def text_to_textnodes(text):
+    nodes = []
+    append = nodes.append
+    search = _INLINE_TOKEN.search
+    text_start = 0
+    pos = 0
+    while True:
+        match = search(text, pos)
+        if match is None:
+            break
+        start = match.start()
+        if start > text_start:
+            append(TextNode(text[text_start:start], TextType.TEXT))
+        delimiter, alt, src, anchor, href = match.groups()
+        if delimiter is not None:
+            open_end = match.end()
+            close = text.find(delimiter, open_end)
+            if close == -1:
+                raise ValueError("Invalid markdown, formatted section not closed")
+            if close > open_end:
+                append(TextNode(text[open_end:close], _DELIMITER_TYPES[delimiter]))
+            pos = close + len(delimiter)
+        elif src is not None:
+            append(TextNode(alt, TextType.IMAGE, src))
+            pos = match.end()
+        else:
+            append(TextNode(anchor, TextType.LINKS, href))
+            pos = match.end()
+        text_start = pos
+    if text_start < len(text):
+        append(TextNode(text[text_start:], TextType.TEXT))
+    return nodes
@@ -0,0 +1,80 @@
+from collections import OrderedDict
+
+from inline_markdown import text_to_textnodes
+
+default_max_entries = 4096
+# Longer texts are rarely repeated word for word; leaving them out keeps the
+# memo for nav lines, list items and other short boilerplate.
+max_text_length = 512
+
+_cache = None
+
+
+class InlineCache():
+    # Bounded LRU memo of text_to_textnodes, keyed on the raw inline text.
+    # It keeps the text nodes rather than HTML nodes: those are rebuilt for
+    # every use, since apply_basepath and apply_images change their props.
+    def __init__(self, max_entries=default_max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def text_to_textnodes(self, text):
+        nodes = self.entries.get(text)
+        if nodes is not None:
+            self.entries.move_to_end(text)
+            self.hits += 1
+            return list(nodes)
+        self.misses += 1
+        nodes = text_to_textnodes(text)
+        self.entries[text] = tuple(nodes)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return nodes
+
+    def counts(self):
+        return self.hits, self.misses, self.evictions
+
+    def __repr__(self):
+        return f"InlineCache({len(self.entries)}/{self.max_entries} entries, {self.hits} hits, {self.misses} misses)"
+
+
+def enable(max_entries=default_max_entries):
+    global _cache
+    _cache = InlineCache(max_entries) if max_entries > 0 else None
+
+
+def max_entries():
+    return _cache.max_entries if _cache is not None else 0
+
+
+def memo_text_to_textnodes(text):
+    if _cache is None or len(text) > max_text_length:
+        return text_to_textnodes(text)
+    return _cache.text_to_textnodes(text)
+
+
+def counts():
+    return _cache.counts() if _cache is not None else (0, 0, 0)
+
+
+def add_counts(counts):
+    # Folds in what a worker process's memo did, so the report covers the
+    # whole build.
+    if _cache is not None:
+        _cache.hits += counts[0]
+        _cache.misses += counts[1]
+        _cache.evictions += counts[2]
+
+
+def report():
+    hits, misses, evictions = counts()
+    lookups = hits + misses
+    rate = hits / lookups * 100 if lookups else 0.0
+    return (
+        f" * inline cache: {hits} hits, {misses} misses ({rate:.1f}% hit rate), "
+        f"{evictions} evictions"
+    )
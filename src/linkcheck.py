@@ -0,0 +1,62 @@
+import json
+import os
+import posixpath
+from urllib.parse import urlsplit
+
+REPORT_VERSION = 1
+
+
+def site_map(outputs, dest_dir_path):
+    # Every URL the built site answers, so checking a reference is a set
+    # lookup instead of a filesystem stat. A directory's index.html also
+    # answers for the directory, with and without the trailing slash.
+    urls = set()
+    for path in outputs:
+        url = "/" + os.path.relpath(path, dest_dir_path).replace(os.sep, "/")
+        urls.add(url)
+        if url.endswith("/index.html"):
+            dir_url = url[:-len("index.html")]
+            urls.add(dir_url)
+            urls.add(dir_url.rstrip("/") or "/")
+    return urls
+
+
+def resolve(target, page_url):
+    # Returns the root-relative path a reference points to, or None for
+    # references this check does not cover: other sites, mailto: and the
+    # like, and fragments within the page.
+    parts = urlsplit(target)
+    if parts.scheme or parts.netloc or parts.path == "":
+        return None
+    path = parts.path
+    if not path.startswith("/"):
+        base = page_url.rsplit("/", 1)[0] + "/"
+        path = posixpath.join(base, path)
+    resolved = posixpath.normpath(path)
+    if path.endswith("/") and resolved != "/":
+        resolved += "/"
+    return resolved
+
+
+def check(references, urls):
+    # references are (source, page_url, kind, target) rows as returned by
+    # siteindex.references. Returns one problem dict per broken reference.
+    problems = []
+    for source, page_url, kind, target in references:
+        path = resolve(target, page_url)
+        if path is not None and path not in urls:
+            problems.append({"source": source, "kind": kind, "target": target, "resolved": path})
+    return problems
+
+
+def report(problems, checked):
+    return {"version": REPORT_VERSION, "checked": checked, "broken": len(problems), "problems": problems}
+
+
+def write_report(path, data):
+    dir_path = os.path.dirname(path)
+    if dir_path != "":
+        os.makedirs(dir_path, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+        f.write("\n")
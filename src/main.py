@@ -1,28 +1,235 @@
+import argparse
 import os
-import shutil
 import sys
 
-from copystatic import copy_files_recursive
-from gencontent import generate_pages_recursive 
+import assets
+import astcache
+import compress
+import images
+import inlinecache
+import linkcheck
+import profiler
+import siteindex
+from copystatic import copy_files_incremental
+from gencontent import generate_pages_incremental
+from manifest import load_manifest, new_manifest, prune_outputs, save_manifest
 
 dir_path_static = "./static"
 dir_path_public = "./docs"
 dir_path_content = "./content"
+dir_path_cache = "./.cache"
 template_path = "./template.html"
+manifest_path = os.path.join(dir_path_cache, "manifest.json")
+# Parse trees (astcache) and rendered pages (rendercache) share this
+# directory and its size limit.
+dir_path_ast_cache = os.path.join(dir_path_cache, "ast")
+index_path = os.path.join(dir_path_cache, "index.sqlite")
+# Resized image variants, named by source hash and settings.
+dir_path_image_cache = os.path.join(dir_path_cache, "images")
 default_basepath = "/"
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the static site into ./docs")
+    parser.add_argument("basepath", nargs="?", default=default_basepath)
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only rebuild pages and static files whose sources changed since the last build",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="render pages across N worker processes (0 uses every CPU)",
+    )
+    parser.add_argument(
+        "--io-threads",
+        type=int,
+        default=0,
+        metavar="N",
+        help="overlap page reads and writes with rendering on N threads (for slow or network filesystems; "
+        "ignored with --jobs)",
+    )
+    parser.add_argument(
+        "--hardlink-static",
+        action="store_true",
+        help="hardlink static files into docs/ instead of copying them (edits to docs/ then reach static/)",
+    )
+    parser.add_argument(
+        "--no-ast-cache",
+        dest="ast_cache",
+        action="store_false",
+        help="always reparse and rerender instead of reusing parse trees and pages from .cache/ast",
+    )
+    parser.add_argument(
+        "--ast-cache-mb",
+        type=float,
+        default=astcache.default_max_bytes / (1024 * 1024),
+        help="size limit of the parse and render cache; least recently used entries are evicted",
+    )
+    parser.add_argument(
+        "--inline-cache",
+        type=int,
+        default=0,
+        metavar="N",
+        help="memoize inline markdown for up to N repeated text fragments and report hits and misses "
+        f"(try {inlinecache.default_max_entries})",
+    )
+    parser.add_argument(
+        "--fingerprint",
+        action="store_true",
+        help="copy static files to content-hashed names (name.<hash>.ext) and point pages at them, so they can be "
+        "served with immutable cache headers",
+    )
+    parser.add_argument(
+        "--images",
+        action="store_true",
+        help="give <img> tags width, height and a srcset of resized variants (variants need Pillow)",
+    )
+    parser.add_argument(
+        "--precompress",
+        action="store_true",
+        help="write .gz siblings of HTML, CSS and other text outputs (redone only for changed files)",
+    )
+    parser.add_argument(
+        "--check-links",
+        action="store_true",
+        help="check internal links and images against the built site; exit with status 1 if any are broken",
+    )
+    parser.add_argument("--link-report", metavar="PATH", help="write the link check as JSON (implies --check-links)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="list every static file copied")
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="time each page and build stage and print a report at the end",
+    )
+    parser.add_argument("--profile-top", type=int, default=10, metavar="N", help="slowest pages to list")
+    parser.add_argument(
+        "--profile-trace",
+        metavar="PATH",
+        help="write a Chrome trace / speedscope JSON file (implies --profile)",
+    )
+    args = parser.parse_args(argv)
+    if args.jobs < 0:
+        parser.error("--jobs must be zero or a positive number")
+    if args.jobs == 0:
+        args.jobs = os.cpu_count() or 1
+    if args.io_threads < 0:
+        parser.error("--io-threads must be zero or a positive number")
+    if args.inline_cache < 0:
+        parser.error("--inline-cache must be zero or a positive number")
+    return args
+
 def main():
-    basepath = default_basepath
-    if len(sys.argv) > 1:
-        basepath = sys.argv[1]
-    print("Deleting public directory...")
-    if os.path.exists(dir_path_public):
-        shutil.rmtree(dir_path_public)
+    args = parse_args()
+    if args.profile or args.profile_trace:
+        profiler.enable()
+    ast_cache_bytes = int(args.ast_cache_mb * 1024 * 1024) if args.ast_cache else None
+    inlinecache.enable(args.inline_cache)
+    manifest = build(args.basepath, args.incremental, args.jobs, args.hardlink_static, args.verbose,
+                     ast_cache_bytes, args.io_threads, args.precompress, args.images, args.fingerprint)
+    problems = []
+    if args.check_links or args.link_report:
+        with profiler.phase("links"):
+            problems = check_links(manifest, args.link_report)
+    if profiler.is_enabled():
+        print(profiler.report(args.profile_top))
+    if args.profile_trace:
+        profiler.write_trace(args.profile_trace)
+        print(f"Wrote trace to {args.profile_trace}")
+    if problems:
+        sys.exit(1)
+
+def build(basepath, incremental=False, jobs=1, hardlink_static=False, verbose=False,
+          ast_cache_bytes=astcache.default_max_bytes, io_threads=0, precompress=False, process_images=False,
+          fingerprint=False):
+    # A full build starts from an empty manifest but keeps docs/: outputs
+    # whose bytes do not change are left untouched, and whatever this build
+    # did not produce is pruned at the end.
+    if incremental:
+        manifest = load_manifest(manifest_path)
+    else:
+        manifest = new_manifest()
 
     print("Copying static files to public directory")
-    copy_files_recursive(dir_path_static, dir_path_public)
+    with profiler.phase("static"):
+        copy_files_incremental(dir_path_static, dir_path_public, manifest, hardlink_static, verbose, fingerprint)
+    asset_map = None
+    if fingerprint:
+        asset_map = assets.asset_map(manifest["static"], dir_path_static, dir_path_public)
+    manifest["assets"] = asset_map.urls if asset_map is not None else {}
+
+    image_table = None
+    if process_images:
+        print("Processing images")
+        with profiler.phase("images"):
+            image_table = images.process_images(manifest, dir_path_public, dir_path_image_cache,
+                                                jobs=jobs if jobs > 1 else None, verbose=verbose,
+                                                basepath=basepath)
+    else:
+        images.remove_variants(manifest, dir_path_public)
 
     print("Generating page...")
-    generate_pages_recursive(dir_path_content, template_path, dir_path_public,basepath)
+    cache_dir = dir_path_ast_cache if ast_cache_bytes is not None else None
+    index = siteindex.open_index(index_path)
+    try:
+        with profiler.phase("pages"):
+            generate_pages_incremental(
+                dir_path_content, template_path, dir_path_public, basepath, manifest, jobs, cache_dir, index,
+                io_threads, image_table, asset_map,
+            )
+    finally:
+        index.close()
+    if inlinecache.max_entries() > 0:
+        print(inlinecache.report())
+    if cache_dir is not None:
+        astcache.prune(cache_dir, ast_cache_bytes)
+    outputs = build_outputs(manifest)
+    if precompress:
+        with profiler.phase("compress"):
+            compressed = compress.precompress(outputs, jobs if jobs > 1 else None)
+        print(f" * {compressed} compressed outputs updated")
+        outputs.extend(compress.gz_path(path) for path in outputs if compress.is_compressible(path))
+    elif manifest.get("precompress", True):
+        # Siblings from an earlier precompressed build would go stale as
+        # their outputs change; a manifest without the flag may have them.
+        removed = compress.remove_compressed(outputs)
+        if removed:
+            print(f" * {removed} compressed outputs removed")
+    manifest["precompress"] = precompress
+    if not incremental:
+        for path in prune_outputs(dir_path_public, outputs):
+            print(f" * removing stale {path}")
+
+    save_manifest(manifest_path, manifest)
+    return manifest
+
+def check_links(manifest, report_path=None):
+    # Links and images come from the index, which has them for every page,
+    # rebuilt this run or not.
+    index = siteindex.open_index(index_path)
+    try:
+        references = siteindex.references(index)
+    finally:
+        index.close()
+    urls = linkcheck.site_map(build_outputs(manifest), dir_path_public)
+    # References are indexed as written; pages point fingerprinted assets
+    # at their new names.
+    urls.update(manifest["assets"])
+    problems = linkcheck.check(references, urls)
+    for problem in problems:
+        print(f" * broken {problem['kind']} in {problem['source']}: {problem['target']}")
+    print(f"Checked {len(references)} links and images, {len(problems)} broken")
+    if report_path is not None:
+        linkcheck.write_report(report_path, linkcheck.report(problems, len(references)))
+    return problems
+
+def build_outputs(manifest):
+    outputs = [entry["dest"] for entry in manifest["pages"].values()]
+    outputs.extend(entry["dest"] for entry in manifest["static"].values())
+    outputs.extend(images.image_outputs(manifest))
+    return outputs
 
-main()
+if __name__ == "__main__":
+    main()
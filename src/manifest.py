@@ -0,0 +1,140 @@
+import filecmp
+import hashlib
+import json
+import os
+
+MANIFEST_VERSION = 4
+
+
+def new_manifest():
+    return {
+        "version": MANIFEST_VERSION,
+        "basepath": None,
+        "pages": {},
+        "static": {},
+        "deps": {},
+        "images": {},
+        "assets": {},
+        "precompress": False,
+    }
+
+
+def load_manifest(path):
+    if not os.path.exists(path):
+        return new_manifest()
+    try:
+        with open(path, "r") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return new_manifest()
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return new_manifest()
+    return manifest
+
+
+def save_manifest(path, manifest):
+    dir_path = os.path.dirname(path)
+    if dir_path != "":
+        os.makedirs(dir_path, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_entry(path, old_entry=None):
+    # Only rehash a source when its size or mtime moved since the last build.
+    stat = os.stat(path)
+    if (
+        old_entry is not None
+        and "hash" in old_entry
+        and old_entry.get("size") == stat.st_size
+        and old_entry.get("mtime_ns") == stat.st_mtime_ns
+    ):
+        digest = old_entry["hash"]
+    else:
+        digest = hash_file(path)
+    return {"hash": digest, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def remove_output(path, root):
+    # A precompressed .gz sibling goes with its output.
+    for output in (path, path + ".gz"):
+        if os.path.isfile(output):
+            os.remove(output)
+    # Drop directories emptied by the removal, but never the output root.
+    root = os.path.abspath(root)
+    dir_path = os.path.dirname(os.path.abspath(path))
+    while dir_path != root and dir_path.startswith(root + os.sep):
+        if os.path.isdir(dir_path) and not os.listdir(dir_path):
+            os.rmdir(dir_path)
+        dir_path = os.path.dirname(dir_path)
+
+
+def write_if_changed(path, data):
+    # Leaves an output with the same bytes alone, so its mtime survives and
+    # rsync or CDN uploads skip it; anything else is replaced atomically.
+    try:
+        if os.path.getsize(path) == len(data):
+            with open(path, "rb") as f:
+                if f.read() == data:
+                    return False
+    except FileNotFoundError:
+        pass
+    dir_path = os.path.dirname(path)
+    if dir_path != "":
+        os.makedirs(dir_path, exist_ok=True)
+    tmp_path = temp_path(path)
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        _remove_quietly(tmp_path)
+        raise
+    return True
+
+
+def replace_if_changed(tmp_path, path):
+    # The streaming counterpart of write_if_changed, for an output already
+    # written to tmp_path.
+    if os.path.isfile(path) and filecmp.cmp(tmp_path, path, shallow=False):
+        os.remove(tmp_path)
+        return False
+    os.replace(tmp_path, path)
+    return True
+
+
+def temp_path(path):
+    return f"{path}.{os.getpid()}.tmp"
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def prune_outputs(root, keep):
+    # Removes every file under root that is not in keep, then any directory
+    # left empty. Used after a full build instead of deleting root up front.
+    keep = {os.path.abspath(path) for path in keep}
+    removed = []
+    for dir_path, dir_names, filenames in os.walk(root, topdown=False):
+        for filename in filenames:
+            path = os.path.join(dir_path, filename)
+            if os.path.abspath(path) not in keep:
+                os.remove(path)
+                removed.append(path)
+        if os.path.abspath(dir_path) != os.path.abspath(root) and not os.listdir(dir_path):
+            os.rmdir(dir_path)
+    return sorted(removed)
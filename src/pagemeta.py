@@ -0,0 +1,84 @@
+from textnode import TextType
+
+
+class PageMeta():
+    # Filled in by the block parser as it builds the tree, so the title, TOC,
+    # search and sitemap never need another pass over the markdown. Links and
+    # images are recorded as written in the source, before any basepath.
+    # A title from the front matter wins over find_title.
+    __slots__ = ("title", "headings", "word_count", "links", "images", "front_matter")
+
+    def __init__(self, title=None, headings=None, word_count=0, links=None, images=None, front_matter=None):
+        self.front_matter = front_matter if front_matter is not None else {}
+        if title is None and "title" in self.front_matter:
+            title = str(self.front_matter["title"])
+        self.title = title
+        self.headings = headings if headings is not None else []
+        self.word_count = word_count
+        self.links = links if links is not None else []
+        self.images = images if images is not None else []
+
+    def add_heading(self, level, text):
+        self.headings.append((level, text))
+
+    def add_words(self, text):
+        self.word_count += len(text.split())
+
+    def add_text_node(self, text_node):
+        self.word_count += len(text_node.text.split())
+        if text_node.text_type == TextType.LINKS:
+            self.links.append(text_node.url)
+        elif text_node.text_type == TextType.IMAGE:
+            self.images.append((text_node.url, text_node.text))
+
+    def require_title(self):
+        if self.title is None:
+            raise ValueError("no title found")
+        return self.title
+
+    def to_dict(self):
+        return {
+            "title": self.title,
+            "headings": [list(heading) for heading in self.headings],
+            "word_count": self.word_count,
+            "links": list(self.links),
+            "images": [list(image) for image in self.images],
+            "front_matter": dict(self.front_matter),
+        }
+
+    @classmethod
+    def from_dict(cls, values):
+        return cls(
+            values["title"],
+            [tuple(heading) for heading in values["headings"]],
+            values["word_count"],
+            list(values["links"]),
+            [tuple(image) for image in values["images"]],
+            dict(values["front_matter"]),
+        )
+
+    def __reduce__(self):
+        return (PageMeta, (self.title, self.headings, self.word_count, self.links, self.images, self.front_matter))
+
+    def __eq__(self, other):
+        if not isinstance(other, PageMeta):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"PageMeta({self.title!r}, {len(self.headings)} headings, {self.word_count} words)"
+
+
+def find_title(markdown):
+    # The first line starting with "# ", wherever it is, or None. This is
+    # the rule extract_title has always used; streamed pages apply it line
+    # by line (extract_title_lines), so both paths agree.
+    if markdown.startswith("# "):
+        start = 2
+    else:
+        start = markdown.find("\n# ")
+        if start == -1:
+            return None
+        start += 3
+    end = markdown.find("\n", start)
+    return markdown[start:] if end == -1 else markdown[start:end]
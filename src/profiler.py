@@ -0,0 +1,213 @@
+import json
+import os
+import time
+
+STAGES = ("read", "cache", "parse", "inline", "serialize", "template", "write")
+
+_enabled = False
+_page = None
+_phases = []
+_records = []
+
+
+class _NullStage():
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage():
+    __slots__ = ("page", "name", "wall", "cpu")
+
+    def __init__(self, page, name):
+        self.page = page
+        self.name = name
+
+    def __enter__(self):
+        self.page["open"].append(self.name)
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        page = self.page
+        stages = page["stages"]
+        open_stages = page["open"]
+        open_stages.pop()
+        _charge(stages, self.name, wall, cpu)
+        if open_stages:
+            # Stages report exclusive time: inline tokenizing inside parse is
+            # charged to "inline" and taken back off "parse".
+            _charge(stages, open_stages[-1], -wall, -cpu)
+        else:
+            page["spans"].append((self.name, self.wall, wall))
+        return False
+
+
+def _charge(stages, name, wall, cpu):
+    totals = stages.get(name)
+    if totals is None:
+        stages[name] = [wall, cpu]
+    else:
+        totals[0] += wall
+        totals[1] += cpu
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def is_enabled():
+    return _enabled
+
+
+def stage(name):
+    if _page is None:
+        return _NULL_STAGE
+    return _Stage(_page, name)
+
+
+def start_page(path):
+    global _page
+    if not _enabled:
+        return
+    _page = {
+        "page": path,
+        "pid": os.getpid(),
+        "start": time.perf_counter(),
+        "cpu_start": time.process_time(),
+        "stages": {},
+        "spans": [],
+        "bytes": 0,
+        "open": [],
+    }
+
+
+def add_bytes(count):
+    if _page is not None:
+        _page["bytes"] += count
+
+
+def finish_page():
+    global _page
+    page = _page
+    _page = None
+    if page is None:
+        return None
+    return {
+        "page": page["page"],
+        "pid": page["pid"],
+        "start": page["start"],
+        "wall": time.perf_counter() - page["start"],
+        "cpu": time.process_time() - page["cpu_start"],
+        "bytes": page["bytes"],
+        "stages": page["stages"],
+        "spans": page["spans"],
+    }
+
+
+def add_record(record):
+    if record is not None:
+        _records.append(record)
+
+
+class _Phase():
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc):
+        _phases.append(
+            (self.name, self.wall, time.perf_counter() - self.wall, time.process_time() - self.cpu)
+        )
+        return False
+
+
+def phase(name):
+    if not _enabled:
+        return _NULL_STAGE
+    return _Phase(name)
+
+
+def report(top=10):
+    lines = []
+    if _phases:
+        lines.append("Build phases:")
+        for name, _, wall, cpu in _phases:
+            lines.append(f"  {name:<12} {wall * 1000:>10.1f}ms wall {cpu * 1000:>10.1f}ms cpu")
+
+    totals = {name: [0.0, 0.0] for name in STAGES}
+    for record in _records:
+        for name, (wall, cpu) in record["stages"].items():
+            totals.setdefault(name, [0.0, 0.0])
+            totals[name][0] += wall
+            totals[name][1] += cpu
+    total_bytes = sum(record["bytes"] for record in _records)
+    lines.append(f"Page stages ({len(_records)} pages, {total_bytes} bytes written):")
+    for name, (wall, cpu) in totals.items():
+        lines.append(f"  {name:<12} {wall * 1000:>10.1f}ms wall {cpu * 1000:>10.1f}ms cpu")
+
+    slowest = sorted(_records, key=lambda record: record["wall"], reverse=True)[:top]
+    if slowest:
+        lines.append(f"Slowest {len(slowest)} pages:")
+        lines.append(f"  {'wall ms':>9} {'cpu ms':>9} {'bytes':>10}  page")
+        for record in slowest:
+            lines.append(
+                f"  {record['wall'] * 1000:>9.2f} {record['cpu'] * 1000:>9.2f} {record['bytes']:>10}  {record['page']}"
+            )
+    return "\n".join(lines)
+
+
+def trace_events():
+    # Chrome trace "complete" events; speedscope and chrome://tracing both
+    # load this format. Timestamps are microseconds from the first event.
+    starts = [start for _, start, _, _ in _phases] + [record["start"] for record in _records]
+    origin = min(starts) if starts else 0.0
+    main_pid = os.getpid()
+    events = []
+    for name, start, wall, cpu in _phases:
+        events.append(_event(name, "build", start - origin, wall, main_pid, {"cpu_ms": cpu * 1000}))
+    for record in _records:
+        stages = {name: {"wall_ms": wall * 1000, "cpu_ms": cpu * 1000} for name, (wall, cpu) in record["stages"].items()}
+        args = {"bytes": record["bytes"], "stages": stages}
+        events.append(_event(record["page"], "page", record["start"] - origin, record["wall"], record["pid"], args))
+        for name, start, wall in record["spans"]:
+            events.append(_event(name, "stage", start - origin, wall, record["pid"], {}))
+    return events
+
+
+def _event(name, category, start, duration, pid, args):
+    return {
+        "name": name,
+        "cat": category,
+        "ph": "X",
+        "ts": round(start * 1e6, 3),
+        "dur": round(duration * 1e6, 3),
+        "pid": pid,
+        "tid": pid,
+        "args": args,
+    }
+
+
+def write_trace(path):
+    with open(path, "w") as f:
+        json.dump({"traceEvents": trace_events(), "displayTimeUnit": "ms"}, f)
+
+
+def reset():
+    global _page
+    _page = None
+    _phases.clear()
+    _records.clear()
@@ -0,0 +1,166 @@
+import argparse
+import gzip
+import hashlib
+import io
+import json
+import os
+import re
+import tarfile
+
+from pagemeta import PageMeta
+
+# Modules whose code decides the bytes of a rendered page. Their sources are
+# hashed into every key, so a cached page never outlives the code that
+# rendered it.
+GENERATOR_MODULES = (
+    "assets",
+    "block_markdown",
+    "frontmatter",
+    "gencontent",
+    "htmlnode",
+    "images",
+    "inline_markdown",
+    "inlinecache",
+    "pagemeta",
+    "rendercache",
+    "siteindex",
+    "template",
+    "textnode",
+)
+
+SUFFIX = ".render"
+
+_ENTRY_NAME = re.compile(r"[0-9a-f]{64}\.render$")
+
+_generator_version = None
+
+
+def generator_version():
+    global _generator_version
+    if _generator_version is None:
+        src_dir = os.path.dirname(os.path.abspath(__file__))
+        digest = hashlib.sha256()
+        for name in GENERATOR_MODULES:
+            with open(os.path.join(src_dir, name + ".py"), "rb") as f:
+                digest.update(f.read())
+        _generator_version = digest.hexdigest()
+    return _generator_version
+
+
+def cache_key(markdown, template, basepath, images=None, assets=None, listing=None):
+    # Every input of a render is length-prefixed, so no two different sets
+    # of inputs can produce the same byte stream, and so the same key.
+    # images is the ImageTable the page's <img> attributes come from,
+    # assets the AssetMap its static references are rewritten with, and
+    # listing the index rows a listing page lists.
+    digest = hashlib.sha256()
+    images_digest = images.digest if images is not None else ""
+    assets_digest = assets.digest if assets is not None else ""
+    listing_part = json.dumps(listing) if listing else ""
+    parts = (generator_version(), template.digest, basepath, images_digest, assets_digest, listing_part, markdown)
+    for part in parts:
+        data = part.encode("utf-8")
+        digest.update(f"{len(data)}:".encode("ascii"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+def _entry_path(cache_dir, key):
+    return os.path.join(cache_dir, key[:2], key + SUFFIX)
+
+
+def load(cache_dir, key):
+    # Returns (html, meta) or None. Entries are a JSON metadata line followed
+    # by the page bytes, so they move between machines and Python versions.
+    path = _entry_path(cache_dir, key)
+    try:
+        with open(path, "rb") as f:
+            header = f.readline()
+            html = f.read().decode("utf-8")
+        meta = PageMeta.from_dict(json.loads(header))
+    except Exception:
+        # A missing, truncated or foreign entry is just a miss.
+        return None
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return html, meta
+
+
+def store(cache_dir, key, html, meta):
+    path = _entry_path(cache_dir, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(json.dumps(meta.to_dict(), sort_keys=True).encode("utf-8") + b"\n")
+        f.write(html.encode("utf-8"))
+    os.replace(tmp_path, path)
+
+
+def entries(cache_dir):
+    found = []
+    if not os.path.isdir(cache_dir):
+        return found
+    for dir_path, _, filenames in os.walk(cache_dir):
+        for filename in filenames:
+            if _ENTRY_NAME.match(filename):
+                found.append(os.path.join(dir_path, filename))
+    return sorted(found, key=os.path.basename)
+
+
+def export_archive(cache_dir, archive_path):
+    # One .tar.gz with the entries sorted and every timestamp and owner
+    # zeroed, so the same cache always exports to the same bytes.
+    paths = entries(cache_dir)
+    tmp_path = archive_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        with gzip.GzipFile(fileobj=f, mode="wb", mtime=0) as gz:
+            with tarfile.open(fileobj=gz, mode="w", format=tarfile.USTAR_FORMAT) as tar:
+                for path in paths:
+                    with open(path, "rb") as entry:
+                        data = entry.read()
+                    info = tarfile.TarInfo(os.path.basename(path))
+                    info.size = len(data)
+                    info.mode = 0o644
+                    tar.addfile(info, io.BytesIO(data))
+    os.replace(tmp_path, archive_path)
+    return len(paths)
+
+
+def import_archive(archive_path, cache_dir):
+    # Only regular files named like cache entries are taken, so an archive
+    # cannot write anywhere else. Entries already present are kept.
+    imported = 0
+    with tarfile.open(archive_path, mode="r:gz") as tar:
+        for info in tar:
+            if not info.isfile() or not _ENTRY_NAME.match(info.name):
+                continue
+            path = _entry_path(cache_dir, info.name[:-len(SUFFIX)])
+            if os.path.exists(path):
+                continue
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with tar.extractfile(info) as src, open(tmp_path, "wb") as dst:
+                dst.write(src.read())
+            os.replace(tmp_path, path)
+            imported += 1
+    return imported
+
+
+def main():
+    from main import dir_path_ast_cache
+
+    parser = argparse.ArgumentParser(description="Export or import the rendered page cache")
+    parser.add_argument("action", choices=("export", "import"))
+    parser.add_argument("archive")
+    parser.add_argument("--cache-dir", default=dir_path_ast_cache)
+    args = parser.parse_args()
+    if args.action == "export":
+        print(f"Exported {export_archive(args.cache_dir, args.archive)} cached pages to {args.archive}")
+    else:
+        print(f"Imported {import_archive(args.archive, args.cache_dir)} cached pages from {args.archive}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import html
+import json
+import os
+import sqlite3
+
+from htmlnode import LeafNode, ParentNode
+
+# Bump when the schema changes; an index with another version is rebuilt.
+INDEX_VERSION = 3
+
+_SCHEMA = """
+CREATE TABLE pages (
+    path TEXT PRIMARY KEY,
+    dest TEXT NOT NULL,
+    url TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    title TEXT,
+    date TEXT,
+    summary TEXT,
+    listing TEXT,
+    word_count INTEGER NOT NULL,
+    front_matter TEXT NOT NULL
+);
+CREATE TABLE links (path TEXT NOT NULL, href TEXT NOT NULL);
+CREATE TABLE images (path TEXT NOT NULL, src TEXT NOT NULL);
+CREATE TABLE tags (path TEXT NOT NULL, tag TEXT NOT NULL);
+CREATE INDEX links_path ON links (path);
+CREATE INDEX images_path ON images (path);
+CREATE INDEX tags_path ON tags (path);
+CREATE INDEX tags_tag ON tags (tag);
+"""
+
+
+def open_index(path):
+    dir_path = os.path.dirname(path)
+    if dir_path != "":
+        os.makedirs(dir_path, exist_ok=True)
+    conn = sqlite3.connect(path)
+    if conn.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+        for (table,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall():
+            conn.execute(f"DROP TABLE {table}")
+        conn.executescript(_SCHEMA)
+        conn.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+        conn.commit()
+    return conn
+
+
+def page_url(dest_path, dest_dir_path):
+    rel_path = os.path.relpath(dest_path, dest_dir_path).replace(os.sep, "/")
+    if rel_path == "index.html":
+        return "/"
+    if rel_path.endswith("/index.html"):
+        return "/" + rel_path[:-len("index.html")]
+    return "/" + rel_path
+
+
+def page_hashes(conn):
+    return dict(conn.execute("SELECT path, hash FROM pages"))
+
+
+def update_page(conn, from_path, dest_path, url, entry, meta):
+    front_matter = meta.front_matter
+    remove_page(conn, from_path)
+    conn.execute(
+        "INSERT INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            from_path,
+            dest_path,
+            url,
+            entry["hash"],
+            entry["mtime_ns"],
+            meta.title,
+            _text(front_matter.get("date")),
+            _text(front_matter.get("summary")),
+            _text(front_matter.get("listing")),
+            meta.word_count,
+            json.dumps(front_matter, sort_keys=True),
+        ),
+    )
+    conn.executemany("INSERT INTO links VALUES (?, ?)", [(from_path, href) for href in meta.links])
+    conn.executemany("INSERT INTO images VALUES (?, ?)", [(from_path, src) for src, _ in meta.images])
+    tags = front_matter.get("tags", [])
+    if not isinstance(tags, list):
+        tags = [tags]
+    conn.executemany("INSERT INTO tags VALUES (?, ?)", [(from_path, str(tag)) for tag in tags])
+
+
+def remove_page(conn, from_path):
+    conn.execute("DELETE FROM pages WHERE path = ?", (from_path,))
+    conn.execute("DELETE FROM links WHERE path = ?", (from_path,))
+    conn.execute("DELETE FROM images WHERE path = ?", (from_path,))
+    conn.execute("DELETE FROM tags WHERE path = ?", (from_path,))
+
+
+def retain(conn, from_paths):
+    # Drops every page that is not in from_paths; returns how many went.
+    removed = [path for path in page_hashes(conn) if path not in from_paths]
+    for from_path in removed:
+        remove_page(conn, from_path)
+    return len(removed)
+
+
+def listing_pages(conn):
+    return conn.execute("SELECT path, dest, listing FROM pages WHERE listing IS NOT NULL ORDER BY path").fetchall()
+
+
+def section_pages(conn, section_path):
+    # Pages under section_path, newest first; listing pages are left out.
+    prefix = os.path.join(section_path, "")
+    return conn.execute(
+        "SELECT path, url, title, date, summary FROM pages"
+        " WHERE substr(path, 1, ?) = ? AND listing IS NULL"
+        " ORDER BY date IS NULL, date DESC, title, path",
+        (len(prefix), prefix),
+    ).fetchall()
+
+
+def tagged_pages(conn, tag):
+    return conn.execute(
+        "SELECT pages.path, url, title, date, summary FROM pages JOIN tags ON tags.path = pages.path"
+        " WHERE tag = ? AND listing IS NULL ORDER BY date IS NULL, date DESC, title, pages.path",
+        (tag,),
+    ).fetchall()
+
+
+def references(conn):
+    # (page path, page url, kind, target) for every link and image in the
+    # site, kind being "link" or "image" and target as written.
+    return conn.execute(
+        "SELECT links.path, url, 'link', href FROM links JOIN pages ON pages.path = links.path"
+        " UNION ALL"
+        " SELECT images.path, url, 'image', src FROM images JOIN pages ON pages.path = images.path"
+        " ORDER BY 1, 3, 4"
+    ).fetchall()
+
+
+def listing_node(rows):
+    # Titles and summaries are front matter text: they are escaped, not
+    # parsed, so underscores, asterisks and brackets come out as written.
+    items = []
+    for _, url, title, date, summary in rows:
+        children = [LeafNode("a", html.escape(title if title is not None else url, quote=False), {"href": url})]
+        rest = ""
+        if date is not None:
+            rest += f" ({date})"
+        if summary is not None:
+            rest += f": {summary}"
+        if rest != "":
+            children.append(LeafNode(None, html.escape(rest, quote=False)))
+        items.append(ParentNode("li", children))
+    return ParentNode("ul", items)
+
+
+def _text(value):
+    return None if value is None else str(value)
@@ -0,0 +1,89 @@
+import hashlib
+import os
+import re
+
+from assets import rewrite_urls
+
+_SLOT = re.compile(r"\{\{ (\w+) \}\}")
+_PARTIAL = re.compile(r"\{\{> ([^}\s]+) \}\}")
+
+_cache = {}
+
+
+class Template():
+    def __init__(self, text, basepath="/", partials=(), assets=None):
+        # re.split with a capture group alternates literal text (even
+        # indices) and slot names (odd indices). The basepath and asset URLs
+        # are applied to the markup once here, never to the values filled in
+        # later; digest covers the result.
+        text = rewrite_urls(text, basepath, assets)
+        self.digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        self.partials = list(partials)
+        self.parts = _SLOT.split(text)
+
+    def slots(self):
+        return self.parts[1::2]
+
+    def render(self, values):
+        parts = self.parts[:]
+        for i in range(1, len(parts), 2):
+            name = parts[i]
+            if name in values:
+                parts[i] = values[name]
+            else:
+                parts[i] = "{{ " + name + " }}"
+        return "".join(parts)
+
+    def stream(self, write, values):
+        # Like render, but hands each part to `write`. A callable value is
+        # called with `write` so it can stream its own output in place.
+        for i, part in enumerate(self.parts):
+            if i % 2 == 0:
+                write(part)
+            elif part not in values:
+                write("{{ " + part + " }}")
+            elif callable(values[part]):
+                values[part](write)
+            else:
+                write(values[part])
+
+    def __repr__(self):
+        return f"Template(slots: {self.slots()})"
+
+
+def load_template(template_path, basepath="/", assets=None):
+    # "{{> name }}" includes the partial at name, relative to the including
+    # file, before slots are split, so partials may hold slots themselves.
+    key = (os.path.abspath(template_path), basepath, assets.digest if assets is not None else None)
+    cached = _cache.get(key)
+    if cached is not None and cached[0] == _file_stats([template_path] + cached[1].partials):
+        return cached[1]
+    partials = []
+    text = _read_with_partials(template_path, partials, [os.path.abspath(template_path)])
+    template = Template(text, basepath, partials, assets)
+    _cache[key] = (_file_stats([template_path] + partials), template)
+    return template
+
+def _read_with_partials(path, partials, including):
+    with open(path, "r") as f:
+        text = f.read()
+
+    def include(match):
+        partial_path = os.path.join(os.path.dirname(path), match.group(1))
+        if os.path.abspath(partial_path) in including:
+            raise ValueError(f"partial {partial_path} includes itself")
+        if partial_path not in partials:
+            partials.append(partial_path)
+        return _read_with_partials(partial_path, partials, including + [os.path.abspath(partial_path)])
+
+    return _PARTIAL.sub(include, text)
+
+def _file_stats(paths):
+    stats = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        stats.append((stat.st_mtime_ns, stat.st_size))
+    return stats
@@ -0,0 +1,44 @@
+import os
+import unittest
+
+from assets import AssetMap, asset_map, fingerprinted_path, rewrite_urls
+
+
+class TestAssetMap(unittest.TestCase):
+    def setUp(self):
+        self.assets = AssetMap({"/index.css": "/index.0123456789ab.css"})
+
+    def test_url(self):
+        self.assertEqual(self.assets.url("/index.css"), "/index.0123456789ab.css")
+        self.assertEqual(self.assets.url("/index.css?v=2#top"), "/index.0123456789ab.css?v=2#top")
+        self.assertEqual(self.assets.url("/other.css"), "/other.css")
+
+    def test_fingerprinted_path(self):
+        self.assertEqual(fingerprinted_path("docs/images/a.png", "0123456789abcdef"), "docs/images/a.0123456789ab.png")
+
+    def test_asset_map_from_static_entries(self):
+        static = {
+            os.path.join("static", "index.css"): {"dest": os.path.join("docs", "index.0123456789ab.css")},
+            os.path.join("static", "robots.txt"): {"dest": os.path.join("docs", "robots.txt")},
+        }
+        self.assertEqual(asset_map(static, "static", "docs").urls, {"/index.css": "/index.0123456789ab.css"})
+
+
+class TestRewriteUrls(unittest.TestCase):
+    def test_basepath_and_assets_in_one_pass(self):
+        text = ('<link href="/index.css" /><script src="/app.js"></script><img src = "/a.png" />'
+                '<a href="https://x.org/">x</a>')
+        assets = AssetMap({"/index.css": "/index.0123456789ab.css"})
+        self.assertEqual(
+            rewrite_urls(text, "/site/", assets),
+            '<link href="/site/index.0123456789ab.css" /><script src="/site/app.js"></script>'
+            '<img src = "/site/a.png" /><a href="https://x.org/">x</a>',
+        )
+
+    def test_unchanged_without_basepath_or_assets(self):
+        text = '<link href="/index.css" />'
+        self.assertIs(rewrite_urls(text), text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest import mock
+
+import astcache
+import gencontent
+from gencontent import generate_pages_recursive, parse_page
+
+
+class TestAstCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = os.path.join(self.tmp.name, "ast")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_key_depends_on_content(self):
+        self.assertEqual(astcache.cache_key("# a"), astcache.cache_key("# a"))
+        self.assertNotEqual(astcache.cache_key("# a"), astcache.cache_key("# b"))
+
+    def test_parse_page_round_trip(self):
+        markdown = "# Title\n\nsome [link](/x) and **bold**"
+        node, meta = parse_page(markdown, self.cache)
+        with mock.patch.object(gencontent, "markdown_to_html_node", side_effect=AssertionError("reparsed")):
+            cached_node, cached_meta = parse_page(markdown, self.cache)
+        self.assertEqual(cached_meta, meta)
+        self.assertEqual(cached_meta.links, ["/x"])
+        self.assertEqual(cached_node.to_html(), node.to_html())
+
+    def test_corrupt_entry_is_a_miss(self):
+        key = astcache.cache_key("# a")
+        astcache.store(self.cache, key, "value")
+        path = os.path.join(self.cache, key[:2], key + ".pickle")
+        with open(path, "wb") as f:
+            f.write(b"not a pickle")
+        self.assertIsNone(astcache.load(self.cache, key))
+
+    def test_prune_evicts_least_recently_used(self):
+        keys = [astcache.cache_key(f"# {i}") for i in range(3)]
+        for i, key in enumerate(keys):
+            astcache.store(self.cache, key, "x" * 1000)
+            path = os.path.join(self.cache, key[:2], key + ".pickle")
+            os.utime(path, ns=(i * 10**9, i * 10**9))
+        astcache.load(self.cache, keys[0])
+        size = os.path.getsize(os.path.join(self.cache, keys[0][:2], keys[0] + ".pickle"))
+        self.assertEqual(astcache.prune(self.cache, 2 * size), 1)
+        self.assertIsNotNone(astcache.load(self.cache, keys[0]))
+        self.assertIsNone(astcache.load(self.cache, keys[1]))
+        self.assertIsNotNone(astcache.load(self.cache, keys[2]))
+
+    def test_template_and_basepath_change_skip_parser(self):
+        content = os.path.join(self.tmp.name, "content")
+        os.makedirs(content)
+        with open(os.path.join(content, "index.md"), "w") as f:
+            f.write("# Home\n\n[post](/blog/post)")
+        template = os.path.join(self.tmp.name, "template.html")
+        with open(template, "w") as f:
+            f.write("{{ Title }}|{{ Content }}")
+        dest = os.path.join(self.tmp.name, "docs")
+        with redirect_stdout(StringIO()):
+            generate_pages_recursive(content, template, dest, "/", cache_dir=self.cache)
+            with open(template, "w") as f:
+                f.write("<h1>{{ Title }}</h1>{{ Content }}")
+            with mock.patch.object(gencontent, "markdown_to_html_node", side_effect=AssertionError("reparsed")):
+                generate_pages_recursive(content, template, dest, "/site/", cache_dir=self.cache)
+        with open(os.path.join(dest, "index.html")) as f:
+            self.assertEqual(f.read(), '<h1>Home</h1><div><h1>Home</h1><p><a href="/site/blog/post">post</a></p></div>')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -45,6 +45,41 @@ This is the same paragraph on a new line
             ],
         )
 
+    def test_iter_markdown_blocks_matches_split(self):
+        md = "# Title\n\n\n\n\nline one\nline two\n \n\n\n- a\n- b\n\n \n\n```\ncode\n```\n"
+        expected = markdown_to_blocks(md)
+        self.assertEqual(list(iter_markdown_blocks([md])), expected)
+        self.assertEqual(list(iter_markdown_blocks(md.splitlines(keepends=True))), expected)
+        self.assertEqual(list(iter_markdown_blocks(md)), expected)
+
+    def test_parse_block_items(self):
+        self.assertEqual(parse_block("- a\n- b"), (BlockType.ULIST, ["a", "b"]))
+        self.assertEqual(parse_block("1. a\n2. b"), (BlockType.OLIST, ["a", "b"]))
+        self.assertEqual(parse_block("> a\n>\n>> b"), (BlockType.QUOTE, ["a", "", "b"]))
+        self.assertEqual(parse_block("- a\nb"), (BlockType.PARAGRAPH, ["- a", "b"]))
+        self.assertEqual(parse_block("## h"), (BlockType.HEADING, None))
+        self.assertEqual(parse_block("```\nx\n```"), (BlockType.CODE, None))
+
+    def test_long_ordered_list(self):
+        block = "\n".join(f"{i}. item" for i in range(1, 120))
+        self.assertEqual(block_to_block(block), BlockType.OLIST)
+        self.assertEqual(block_to_block(block.replace("105. ", "106. ")), BlockType.PARAGRAPH)
+
+    def test_block_to_html_node_lists_and_quotes(self):
+        self.assertEqual(
+            block_to_html_node("- **a**\n- b").to_html(),
+            "<ul><li><b>a</b></li><li>b</li></ul>",
+        )
+        self.assertEqual(
+            block_to_html_node("1. a\n2. _b_").to_html(),
+            "<ol><li>a</li><li><i>b</i></li></ol>",
+        )
+        self.assertEqual(
+            block_to_html_node("> quoted\n> text").to_html(),
+            "<blockquote>quoted text</blockquote>",
+        )
+        self.assertEqual(ulist_to_html_node("- a\n- b").to_html(), "<ul><li>a</li><li>b</li></ul>")
+
     def test_heading_single_hash(self):
         """Test heading with single #"""
         block = "# This is a heading"
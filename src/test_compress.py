@@ -0,0 +1,59 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from compress import gz_path, precompress, remove_compressed
+from manifest import remove_output, write_if_changed
+
+
+class TestPrecompress(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.pages = [os.path.join(self.root, f"page{i}.html") for i in range(4)]
+        for i, path in enumerate(self.pages):
+            write_if_changed(path, f"<p>page {i}</p>".encode() * 50)
+        self.image = os.path.join(self.root, "image.png")
+        write_if_changed(self.image, b"\x89PNG")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_siblings_written_for_text_outputs(self):
+        self.assertEqual(precompress(self.pages + [self.image]), 4)
+        with gzip.open(gz_path(self.pages[1]), "rb") as f:
+            self.assertEqual(f.read(), b"<p>page 1</p>" * 50)
+        self.assertFalse(os.path.exists(gz_path(self.image)))
+
+    def test_only_changed_outputs_recompressed(self):
+        precompress(self.pages)
+        self.assertEqual(precompress(self.pages), 0)
+        write_if_changed(self.pages[2], b"<p>new</p>")
+        self.assertEqual(precompress(self.pages), 1)
+        with gzip.open(gz_path(self.pages[2]), "rb") as f:
+            self.assertEqual(f.read(), b"<p>new</p>")
+
+    def test_output_is_reproducible(self):
+        precompress(self.pages[:1])
+        with open(gz_path(self.pages[0]), "rb") as f:
+            first = f.read()
+        os.remove(gz_path(self.pages[0]))
+        precompress(self.pages[:1])
+        with open(gz_path(self.pages[0]), "rb") as f:
+            self.assertEqual(f.read(), first)
+
+    def test_removed_output_takes_its_sibling(self):
+        precompress(self.pages[:1])
+        remove_output(self.pages[0], self.root)
+        self.assertFalse(os.path.exists(gz_path(self.pages[0])))
+
+    def test_remove_compressed(self):
+        precompress(self.pages)
+        self.assertEqual(remove_compressed(self.pages + [self.image]), 4)
+        self.assertFalse(any(os.path.exists(gz_path(path)) for path in self.pages))
+        self.assertTrue(os.path.exists(self.pages[0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
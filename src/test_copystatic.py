@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from copystatic import copy_files_incremental, fast_copy
+from manifest import new_manifest
+
+
+class TestCopyStatic(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.public = os.path.join(self.tmp.name, "docs")
+        os.makedirs(os.path.join(self.static, "images"))
+        for name, data in (("index.css", b"body {}"), ("images/a.png", b"\x89PNG" * 1000)):
+            with open(os.path.join(self.static, name), "wb") as f:
+                f.write(data)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def sync(self, manifest, hardlink=False):
+        with redirect_stdout(StringIO()):
+            return copy_files_incremental(self.static, self.public, manifest, hardlink)
+
+    def test_skips_matching_size_and_mtime(self):
+        self.assertEqual(self.sync(new_manifest()), 2)
+        # A fresh manifest still skips outputs that already match their source.
+        self.assertEqual(self.sync(new_manifest()), 0)
+        with open(os.path.join(self.public, "images", "a.png"), "rb") as f:
+            self.assertEqual(f.read(), b"\x89PNG" * 1000)
+
+    def test_changed_source_recopied(self):
+        manifest = new_manifest()
+        self.sync(manifest)
+        with open(os.path.join(self.static, "index.css"), "wb") as f:
+            f.write(b"body { color: red }")
+        self.assertEqual(self.sync(manifest), 1)
+        with open(os.path.join(self.public, "index.css"), "rb") as f:
+            self.assertEqual(f.read(), b"body { color: red }")
+
+    def test_hardlink_then_copy_leaves_source_intact(self):
+        self.sync(new_manifest(), hardlink=True)
+        source = os.path.join(self.static, "index.css")
+        dest = os.path.join(self.public, "index.css")
+        self.assertTrue(os.path.samefile(source, dest))
+
+        fast_copy(os.path.join(self.static, "images", "a.png"), dest)
+        self.assertFalse(os.path.samefile(source, dest))
+        with open(source, "rb") as f:
+            self.assertEqual(f.read(), b"body {}")
+
+    def test_fingerprinted_copy_renamed_when_source_changes(self):
+        manifest = new_manifest()
+        with redirect_stdout(StringIO()):
+            copy_files_incremental(self.static, self.public, manifest, fingerprint=True)
+        first = manifest["static"][os.path.join(self.static, "index.css")]["dest"]
+        self.assertRegex(os.path.basename(first), r"^index\.[0-9a-f]{12}\.css$")
+        self.assertFalse(os.path.exists(os.path.join(self.public, "index.css")))
+
+        with open(os.path.join(self.static, "index.css"), "wb") as f:
+            f.write(b"body { color: red }")
+        with redirect_stdout(StringIO()):
+            copied = copy_files_incremental(self.static, self.public, manifest, fingerprint=True)
+        second = manifest["static"][os.path.join(self.static, "index.css")]["dest"]
+        self.assertEqual(copied, 1)
+        self.assertNotEqual(first, second)
+        self.assertFalse(os.path.exists(first))
+        with open(second, "rb") as f:
+            self.assertEqual(f.read(), b"body { color: red }")
+
+    def test_fingerprint_turned_on_between_builds(self):
+        # Entries from a plain build record no hash.
+        manifest = new_manifest()
+        self.sync(manifest)
+        with redirect_stdout(StringIO()):
+            copied = copy_files_incremental(self.static, self.public, manifest, fingerprint=True)
+        self.assertEqual(copied, 2)
+        dest = manifest["static"][os.path.join(self.static, "index.css")]["dest"]
+        self.assertRegex(os.path.basename(dest), r"^index\.[0-9a-f]{12}\.css$")
+        self.assertFalse(os.path.exists(os.path.join(self.public, "index.css")))
+
+    def test_quiet_by_default(self):
+        output = StringIO()
+        with redirect_stdout(output):
+            copy_files_incremental(self.static, self.public, new_manifest())
+        self.assertEqual(output.getvalue(), " * 2 of 2 static files updated\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
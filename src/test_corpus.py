@@ -0,0 +1,39 @@
+import os
+import random
+import tempfile
+import unittest
+
+from block_markdown import BlockType, block_to_block, markdown_to_blocks, markdown_to_html_node
+from corpus import DEFAULT_MIX, parse_weights, synthetic_page, write_corpus
+
+
+class TestCorpus(unittest.TestCase):
+    def test_deterministic(self):
+        with tempfile.TemporaryDirectory() as first, tempfile.TemporaryDirectory() as second:
+            paths_a = write_corpus(first, 5, 2000, seed=7)
+            paths_b = write_corpus(second, 5, 2000, seed=7)
+            for a, b in zip(paths_a, paths_b):
+                self.assertEqual(os.path.relpath(a, first), os.path.relpath(b, second))
+                with open(a) as fa, open(b) as fb:
+                    self.assertEqual(fa.read(), fb.read())
+
+    def test_pages_parse(self):
+        rng = random.Random(1)
+        for _ in range(20):
+            page = synthetic_page(rng, 4000)
+            self.assertGreaterEqual(len(page), 4000)
+            self.assertTrue(markdown_to_html_node(page).to_html().startswith("<div>"))
+
+    def test_mix_controls_block_kinds(self):
+        mix = parse_weights("heading=0,paragraph=0,ulist=0,olist=0,quote=0,image=0", DEFAULT_MIX)
+        page = synthetic_page(random.Random(2), 3000, mix)
+        kinds = {block_to_block(block) for block in markdown_to_blocks(page)[1:]}
+        self.assertEqual(kinds, {BlockType.CODE})
+
+    def test_unknown_mix_entry(self):
+        with self.assertRaises(ValueError):
+            parse_weights("tables=3", DEFAULT_MIX)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+import siteindex
+from depgraph import DepGraph
+from gencontent import generate_pages_incremental
+from manifest import new_manifest
+
+
+class TestDepGraph(unittest.TestCase):
+    def test_staleness(self):
+        graph = DepGraph()
+        graph.set_dependencies("a.md", "template", {"t.html": "h1"})
+        graph.set_dependencies("b.md", "template", {"t.html": "h1"})
+        self.assertFalse(graph.is_stale("a.md", {"template": {"t.html": "h1"}}))
+        self.assertTrue(graph.is_stale("a.md", {"template": {"t.html": "h2"}}))
+        self.assertTrue(graph.is_stale("a.md", {"partial": {}}))
+        self.assertTrue(graph.is_stale("new.md", {"template": {"t.html": "h1"}}))
+
+        graph.retain({"b.md"})
+        self.assertEqual(list(graph.to_dict()), ["b.md"])
+        self.assertEqual(DepGraph.from_dict(graph.to_dict()).to_dict(), graph.to_dict())
+
+
+class TestMinimalRebuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.content = os.path.join(root, "content")
+        self.public = os.path.join(root, "docs")
+        self.template = os.path.join(root, "template.html")
+        self.partial = os.path.join(root, "footer.html")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}{{> footer.html }}")
+        self.write(self.partial, "<footer>v1</footer>")
+        self.write(os.path.join(self.content, "index.md"), "---\nlisting: blog\n---\n# Blog")
+        self.write(os.path.join(self.content, "about.md"), "# About\n\n[blog](/)")
+        for name in ("a", "b"):
+            self.write(os.path.join(self.content, "blog", name, "index.md"), f"---\ndate: 2024-01-0{len(name)}\n---\n# {name}")
+        self.index = siteindex.open_index(os.path.join(root, "index.sqlite"))
+        self.manifest = new_manifest()
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def build(self):
+        out = StringIO()
+        with redirect_stdout(out):
+            generate_pages_incremental(self.content, self.template, self.public, "/", self.manifest, index=self.index)
+        rendered = [line.split()[1] for line in out.getvalue().splitlines() if line.startswith(f" * {self.content}")]
+        return sorted(os.path.relpath(path, self.content) for path in rendered)
+
+    def test_changes_reach_only_dependents(self):
+        self.assertEqual(len(self.build()), 4)
+        self.assertEqual(self.build(), [])
+
+        # A page outside the listed section leaves the listing alone.
+        self.write(os.path.join(self.content, "about.md"), "# About us")
+        self.assertEqual(self.build(), ["about.md"])
+
+        # A listed page brings its listing page with it.
+        self.write(os.path.join(self.content, "blog", "a", "index.md"), "---\ndate: 2024-01-01\n---\n# A")
+        self.assertEqual(self.build(), ["blog/a/index.md", "index.md"])
+
+        # Every page is rendered with the partial.
+        self.write(self.partial, "<footer>v2</footer>")
+        self.assertEqual(len(self.build()), 4)
+        with open(os.path.join(self.public, "about.html")) as f:
+            self.assertIn("<footer>v2</footer>", f.read())
+
+    def test_graph_is_persisted_in_the_manifest(self):
+        self.build()
+        deps = self.manifest["deps"]
+        about = os.path.join(self.content, "about.md")
+        self.assertEqual(list(deps[about]["partial"]), [self.partial])
+        self.assertEqual(deps[about]["asset"], {"/": "/"})
+        listing = os.path.join(self.content, "index.md")
+        self.assertEqual(
+            sorted(deps[listing]["member"]),
+            sorted(os.path.join(self.content, "blog", name, "index.md") for name in ("a", "b")),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import io
+import unittest
+
+from frontmatter import parse_value, read_front_matter, split_front_matter
+
+
+class TestFrontMatter(unittest.TestCase):
+    def test_yaml_style(self):
+        front_matter, body = split_front_matter(
+            "---\ntitle: Why Tom Bombadil Was a Mistake\ndate: 2022-01-10\n"
+            "draft: false\ntags: [tolkien, \"opinion\"]\n\n---\n# Heading\n\nText"
+        )
+        self.assertEqual(
+            front_matter,
+            {"title": "Why Tom Bombadil Was a Mistake", "date": "2022-01-10", "draft": False, "tags": ["tolkien", "opinion"]},
+        )
+        self.assertEqual(body, "# Heading\n\nText")
+
+    def test_toml_style(self):
+        front_matter, body = split_front_matter('+++\ntitle = "Contact"\nweight = 3\n+++\nbody')
+        self.assertEqual(front_matter, {"title": "Contact", "weight": 3})
+        self.assertEqual(body, "body")
+
+    def test_no_front_matter(self):
+        self.assertEqual(split_front_matter("# Title\n\n---\n"), ({}, "# Title\n\n---\n"))
+        self.assertEqual(split_front_matter("----\nx"), ({}, "----\nx"))
+
+    def test_not_closed_or_not_pairs_is_body(self):
+        for markdown in (
+            "---\ntitle: x\n",
+            "---\n\n# Title\n\ntext",
+            "---\nnot a pair\n---\n",
+            "---\n# Title\n---\ntext",
+        ):
+            self.assertEqual(split_front_matter(markdown), ({}, markdown))
+            from_file = io.StringIO(markdown)
+            self.assertEqual(read_front_matter(from_file), {})
+            self.assertEqual(from_file.read(), markdown)
+
+    def test_values(self):
+        self.assertEqual(parse_value("1.5"), 1.5)
+        self.assertEqual(parse_value("'quoted: text'"), "quoted: text")
+        self.assertEqual(parse_value("[]"), [])
+        self.assertEqual(parse_value("true"), True)
+
+    def test_read_stops_at_the_body(self):
+        from_file = io.StringIO("---\nsummary: short\n---\n# Title\n\nbody\n")
+        self.assertEqual(read_front_matter(from_file), {"summary": "short"})
+        self.assertEqual(from_file.read(), "# Title\n\nbody\n")
+
+        from_file = io.StringIO("# Title\n")
+        self.assertEqual(read_front_matter(from_file), {})
+        self.assertEqual(from_file.read(), "# Title\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
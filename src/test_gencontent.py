@@ -1,6 +1,11 @@
+import os
+import tempfile
 import unittest
+from contextlib import redirect_stdout
+from io import StringIO
 
-from gencontent import extract_title
+import gencontent
+from gencontent import extract_title, extract_title_lines, generate_pages_recursive
 
 
 class TestExtractTitle(unittest.TestCase):
@@ -46,5 +51,133 @@ no title
             pass
 
 
+class TestParallelGeneration(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        with open(self.template, "w") as f:
+            f.write('<title>{{ Title }}</title><a href="/">home</a>{{ Content }}')
+        for i in range(12):
+            self.write_page(f"post{i}/index.md", f"# Post {i}\n\n[next](/post{i + 1}) **bold** _it_\n\n- a\n- b")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_page(self, name, text):
+        path = os.path.join(self.content, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def build(self, dest, jobs, io_threads=0):
+        dest = os.path.join(self.tmp.name, dest)
+        with redirect_stdout(StringIO()):
+            generate_pages_recursive(self.content, self.template, dest, "/site/", jobs, io_threads=io_threads)
+        return dest
+
+    def read_tree(self, root):
+        files = {}
+        for dir_path, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(dir_path, filename)
+                with open(path, "rb") as f:
+                    files[os.path.relpath(path, root)] = f.read()
+        return files
+
+    def test_parallel_matches_serial(self):
+        serial = self.read_tree(self.build("serial", 1))
+        parallel = self.read_tree(self.build("parallel", 4))
+        self.assertEqual(len(serial), 12)
+        self.assertEqual(serial, parallel)
+
+    def test_pipelined_matches_serial(self):
+        serial = self.read_tree(self.build("serial", 1))
+        pipelined = self.read_tree(self.build("pipelined", 1, io_threads=2))
+        self.assertEqual(serial, pipelined)
+
+    def test_pipelined_error_stops_the_build(self):
+        self.write_page("post5/index.md", "no title")
+        with self.assertRaises(ValueError):
+            self.build("out", 1, io_threads=2)
+
+    def test_parallel_errors_are_ordered(self):
+        self.write_page("post7/index.md", "no title")
+        self.write_page("post2/index.md", "also no title")
+        messages = set()
+        for _ in range(3):
+            with self.assertRaises(ValueError) as context:
+                self.build("out", 4)
+            messages.add(str(context.exception))
+        self.assertEqual(len(messages), 1)
+        message = messages.pop()
+        self.assertIn("failed to generate 2 page(s)", message)
+        self.assertLess(message.index("post2"), message.index("post7"))
+
+
+class TestStreamingGeneration(unittest.TestCase):
+    def test_streamed_page_matches_whole_page(self):
+        markdown = (
+            "Intro with a [link](/blog/x)\n\n# The Title\n\n"
+            + "\n\n".join(f"- item {i}\n- **bold** `code`\n\n> quote {i}\n> more" for i in range(50))
+            + "\n\n```\ncode block\n```\n"
+        )
+        with tempfile.TemporaryDirectory() as root:
+            source = os.path.join(root, "index.md")
+            with open(source, "w") as f:
+                f.write(markdown)
+            template = os.path.join(root, "template.html")
+            with open(template, "w") as f:
+                f.write('<title>{{ Title }}</title><a href="/">home</a>{{ Content }}{{ Footer }}')
+
+            whole = os.path.join(root, "whole.html")
+            gencontent.write_page(whole, gencontent.render_page(source, template, "/site/"))
+            streamed = os.path.join(root, "out", "streamed.html")
+            gencontent.stream_page(source, template, streamed, "/site/")
+            with open(whole, "rb") as a, open(streamed, "rb") as b:
+                self.assertEqual(a.read(), b.read())
+
+    def test_front_matter_whole_and_streamed(self):
+        markdown = "---\ntitle: From Front Matter\nsummary: short\n---\n# Heading\n\ntext\n"
+        with tempfile.TemporaryDirectory() as root:
+            source = os.path.join(root, "post", "index.md")
+            os.makedirs(os.path.dirname(source))
+            with open(source, "w") as f:
+                f.write(markdown)
+            template = os.path.join(root, "template.html")
+            with open(template, "w") as f:
+                f.write("<title>{{ Title }}</title>{{ Content }}")
+
+            html = gencontent.render_page(source, template, "/")
+            self.assertEqual(html, "<title>From Front Matter</title><div><h1>Heading</h1><p>text</p></div>")
+            streamed = os.path.join(root, "streamed.html")
+            meta = gencontent.stream_page(source, template, streamed, "/")
+            with open(streamed) as f:
+                self.assertEqual(f.read(), html)
+            self.assertEqual(meta.front_matter["summary"], "short")
+
+    def test_title_rule_whole_and_streamed(self):
+        with tempfile.TemporaryDirectory() as root:
+            source = os.path.join(root, "index.md")
+            with open(source, "w") as f:
+                f.write("Intro line\n# My Title\n\nBody\n")
+            template = os.path.join(root, "template.html")
+            with open(template, "w") as f:
+                f.write("<title>{{ Title }}</title>")
+            html, meta = gencontent.render_page_meta(source, template, "/")
+            streamed = os.path.join(root, "streamed.html")
+            streamed_meta = gencontent.stream_page(source, template, streamed, "/")
+            with open(streamed) as f:
+                self.assertEqual(f.read(), html)
+            self.assertEqual(html, "<title>My Title</title>")
+            self.assertEqual(meta.title, streamed_meta.title)
+
+    def test_extract_title_lines(self):
+        self.assertEqual(extract_title_lines(["intro\n", "# Title\n", "# Other\n"]), "Title")
+        self.assertEqual(extract_title_lines(["# Last"]), "Last")
+        with self.assertRaises(ValueError):
+            extract_title_lines(["no title\n"])
+
+
 if __name__ == "__main__":
     unittest.main()
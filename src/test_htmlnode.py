@@ -1,4 +1,5 @@
 import unittest
+from io import StringIO
 
 from htmlnode import *
 from textnode import *
@@ -105,6 +106,41 @@ class TestHtmlNode(unittest.TestCase):
         self.assertEqual(html_node.tag, "a")
         self.assertEqual(html_node.value, "Bad link")
         self.assertEqual(html_node.props, {"href": None})
+
+    def test_streaming_matches_to_html(self):
+        node = ParentNode(
+            "div",
+            [
+                ParentNode("p", [LeafNode("b", "Bold"), LeafNode(None, " text")]),
+                ParentNode("ul", [ParentNode("li", [LeafNode("a", "link", {"href": "/x"})])]),
+                LeafNode("img", "", {"src": "/a.png", "alt": "a"}),
+            ],
+            {"class": "page"},
+        )
+        expected = '<div class="page"><p><b>Bold</b> text</p><ul><li><a href="/x">link</a></li></ul><img src="/a.png" alt="a"></img></div>'
+        self.assertEqual(node.to_html(), expected)
+        self.assertEqual("".join(node.iter_html()), expected)
+        buffer = StringIO()
+        node.write_html(buffer)
+        self.assertEqual(buffer.getvalue(), expected)
+
+    def test_streaming_deep_tree(self):
+        node = LeafNode("b", "x")
+        for _ in range(2000):
+            node = ParentNode("span", [node])
+        expected = "<span>" * 2000 + "<b>x</b>" + "</span>" * 2000
+        self.assertEqual("".join(node.iter_html()), expected)
+        self.assertEqual(node.to_html(), expected)
+        buffer = StringIO()
+        node.write_html(buffer)
+        self.assertEqual(buffer.getvalue(), expected)
+
+    def test_iter_html_invalid_child(self):
+        node = ParentNode("div", [ParentNode("p", None)])
+        with self.assertRaises(ValueError):
+            list(node.iter_html())
+        with self.assertRaises(ValueError):
+            node.to_html()
 """    
     def test_missing_url_for_image(self):
         text_node = TextNode("Missing image", TextType.IMAGE)
@@ -0,0 +1,171 @@
+import os
+import struct
+import tempfile
+import unittest
+import zlib
+from contextlib import redirect_stdout
+from io import StringIO
+
+from copystatic import copy_files_incremental
+from htmlnode import LeafNode, ParentNode
+from images import (
+    Image,
+    ImageTable,
+    apply_images,
+    image_outputs,
+    image_size,
+    image_table,
+    process_images,
+    prune_cache,
+    remove_variants,
+)
+from manifest import new_manifest
+
+
+def png_bytes(width, height):
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    rows = b"".join(b"\x00" + b"\x80\x40\x20" * width for _ in range(height))
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(rows))
+        + chunk(b"IEND", b"")
+    )
+
+
+class TestImageSize(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, data):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_png(self):
+        self.assertEqual(image_size(self.write("a.png", png_bytes(30, 20))), (30, 20))
+
+    def test_gif(self):
+        self.assertEqual(image_size(self.write("a.gif", b"GIF89a" + struct.pack("<HH", 640, 480) + b"\x00" * 8)),
+                         (640, 480))
+
+    def test_jpeg(self):
+        app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9
+        sof = b"\xff\xc0" + struct.pack(">HBHH", 11, 8, 200, 300) + b"\x01\x01\x11\x00"
+        self.assertEqual(image_size(self.write("a.jpg", b"\xff\xd8" + app0 + sof)), (300, 200))
+
+    @unittest.skipIf(Image is not None, "Pillow reads other formats")
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            image_size(self.write("a.png", b"not an image"))
+
+
+class TestApplyImages(unittest.TestCase):
+    def test_attributes_added_to_known_images(self):
+        table = image_table({
+            "static/a.png": {
+                "url": "/images/a.png",
+                "width": 1200,
+                "height": 600,
+                "variants": [[480, "docs/images/a-480w.png", "cache/x.png"]],
+            },
+        })
+        node = ParentNode("div", [
+            LeafNode("img", "", {"src": "/images/a.png", "alt": "a"}),
+            LeafNode("img", "", {"src": "/images/b.png", "alt": "b"}),
+        ])
+        apply_images(node, table)
+        self.assertEqual(
+            node.children[0].props,
+            {
+                "src": "/images/a.png",
+                "alt": "a",
+                "width": "1200",
+                "height": "600",
+                "srcset": "/images/a-480w.png 480w, /images/a.png 1200w",
+            },
+        )
+        self.assertEqual(node.children[1].props, {"src": "/images/b.png", "alt": "b"})
+
+        table = image_table({"static/a.png": {"url": "/images/a.png", "width": 1200, "height": 600,
+                                              "variants": [[480, "docs/images/a-480w.png", "cache/x.png"]]}},
+                            "/site/")
+        self.assertEqual(
+            table.get("/images/a.png")["srcset"], "/site/images/a-480w.png 480w, /site/images/a.png 1200w"
+        )
+
+    def test_fingerprint_and_digest_follow_entries(self):
+        first = ImageTable({"/a.png": {"width": 10, "height": 5}})
+        second = ImageTable({"/a.png": {"width": 10, "height": 6}})
+        self.assertNotEqual(first.fingerprint("/a.png"), second.fingerprint("/a.png"))
+        self.assertNotEqual(first.digest, second.digest)
+        self.assertIsNone(first.fingerprint("/b.png"))
+
+
+class TestProcessImages(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.docs = os.path.join(self.tmp.name, "docs")
+        self.cache = os.path.join(self.tmp.name, "cache")
+        os.makedirs(os.path.join(self.static, "images"))
+        self.source = os.path.join(self.static, "images", "wide.png")
+        with open(self.source, "wb") as f:
+            f.write(png_bytes(600, 100))
+        self.manifest = new_manifest()
+        copy_files_incremental(self.static, self.docs, self.manifest)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_table_has_dimensions(self):
+        table = process_images(self.manifest, self.docs, self.cache, widths=(300,))
+        entry = table.get("/images/wide.png")
+        self.assertEqual((entry["width"], entry["height"]), (600, 100))
+
+    def test_unreadable_image_skipped(self):
+        broken = os.path.join(self.static, "images", "broken.png")
+        with open(broken, "wb") as f:
+            f.write(b"not an image")
+        copy_files_incremental(self.static, self.docs, self.manifest)
+        output = StringIO()
+        with redirect_stdout(output):
+            table = process_images(self.manifest, self.docs, self.cache, widths=(300,))
+        self.assertIn(f"warning: skipping {broken}", output.getvalue())
+        self.assertIsNone(table.get("/images/broken.png"))
+        self.assertIsNotNone(table.get("/images/wide.png"))
+
+    def test_prune_cache(self):
+        os.makedirs(self.cache)
+        paths = [os.path.join(self.cache, name) for name in ("keep.png", "stale.png")]
+        for path in paths:
+            with open(path, "wb") as f:
+                f.write(b"x")
+        prune_cache(self.cache, {paths[0]})
+        self.assertEqual(os.listdir(self.cache), ["keep.png"])
+        prune_cache(os.path.join(self.tmp.name, "missing"), set())
+
+    @unittest.skipIf(Image is None, "Pillow is not installed")
+    def test_variants_made_once_and_removed(self):
+        table = process_images(self.manifest, self.docs, self.cache, widths=(300, 900))
+        variant = os.path.join(self.docs, "images", "wide-300w.png")
+        self.assertEqual(image_outputs(self.manifest), [variant])
+        self.assertEqual(image_size(variant), (300, 50))
+        self.assertEqual(table.get("/images/wide.png")["srcset"], "/images/wide-300w.png 300w, /images/wide.png 600w")
+
+        mtime = os.stat(variant).st_mtime_ns
+        process_images(self.manifest, self.docs, self.cache, widths=(300, 900))
+        self.assertEqual(os.stat(variant).st_mtime_ns, mtime)
+
+        remove_variants(self.manifest, self.docs)
+        self.assertFalse(os.path.exists(variant))
+        self.assertEqual(self.manifest["images"], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,7 +2,7 @@ import unittest
 from inline_markdown import (
     split_nodes_delimiter, extract_markdown_images,
     extract_markdown_links, split_nodes_image,
-    split_nodes_link, text_to_textnodes
+    split_nodes_link, text_to_textnodes, cascade_to_textnodes
 )
 
 from textnode import TextNode, TextType
@@ -298,5 +298,68 @@ class TestInlineMarkdown(unittest.TestCase):
                 ],
                 nodes,
             )
+
+
+class TestTextToTextNodes(unittest.TestCase):
+    def test_all_types(self):
+        nodes = text_to_textnodes(
+            "This is **text** with an _italic_ word and a `code block` and an ![image](https://i.imgur.com/zjjcJKZ.png) and a [link](https://boot.dev)"
+        )
+        self.assertListEqual(
+            [
+                TextNode("This is ", TextType.TEXT),
+                TextNode("text", TextType.BOLD),
+                TextNode(" with an ", TextType.TEXT),
+                TextNode("italic", TextType.ITALIC),
+                TextNode(" word and a ", TextType.TEXT),
+                TextNode("code block", TextType.CODE),
+                TextNode(" and an ", TextType.TEXT),
+                TextNode("image", TextType.IMAGE, "https://i.imgur.com/zjjcJKZ.png"),
+                TextNode(" and a ", TextType.TEXT),
+                TextNode("link", TextType.LINKS, "https://boot.dev"),
+            ],
+            nodes,
+        )
+
+    def test_matches_split_cascade(self):
+        cases = [
+            "",
+            "plain text",
+            "**bold** at start and _end_",
+            "***triple***",
+            "****",
+            "a [link](/x) then ![img](/i.png) then [another](/y)",
+            "![](empty-alt.png) and [](empty-anchor)",
+            "not a link: link](https://example.com) or [link(https://example.com)",
+            "![image(https://example.com/img.jpg) [ok](/ok)",
+            "`code` **bold** `more code`",
+            "- [Why Tom Bombadil Was a Mistake](/blog/tom)",
+        ]
+        for text in cases:
+            self.assertListEqual(cascade_to_textnodes(text), text_to_textnodes(text), text)
+
+    def test_many_links(self):
+        text = " ".join(f"[link {i}](/page/{i})" for i in range(200))
+        nodes = text_to_textnodes(text)
+        self.assertEqual(len(nodes), 399)
+        self.assertEqual(nodes[-1], TextNode("link 199", TextType.LINKS, "/page/199"))
+
+    def test_underscore_inside_link_url(self):
+        nodes = text_to_textnodes("see [docs](/a_b) and [more](/c_d)")
+        self.assertListEqual(
+            [
+                TextNode("see ", TextType.TEXT),
+                TextNode("docs", TextType.LINKS, "/a_b"),
+                TextNode(" and ", TextType.TEXT),
+                TextNode("more", TextType.LINKS, "/c_d"),
+            ],
+            nodes,
+        )
+
+    def test_unclosed_delimiter(self):
+        for text in ("**bold", "an _italic", "`code", "**a** and `b"):
+            with self.assertRaises(ValueError):
+                text_to_textnodes(text)
+
 if __name__ == "__main__":
     unittest.main()
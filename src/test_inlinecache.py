@@ -0,0 +1,57 @@
+import unittest
+
+import inlinecache
+from block_markdown import markdown_to_html_node
+from inlinecache import InlineCache
+from inline_markdown import text_to_textnodes
+from textnode import TextNode, TextType
+
+
+class TestInlineCache(unittest.TestCase):
+    def test_hit_returns_same_nodes(self):
+        cache = InlineCache(4)
+        text = "see [home](/) and **bold**"
+        first = cache.text_to_textnodes(text)
+        first.append(TextNode("extra", TextType.TEXT))
+        self.assertEqual(cache.text_to_textnodes(text), text_to_textnodes(text))
+        self.assertEqual(cache.counts(), (1, 1, 0))
+
+    def test_least_recently_used_evicted(self):
+        cache = InlineCache(2)
+        cache.text_to_textnodes("a")
+        cache.text_to_textnodes("b")
+        cache.text_to_textnodes("a")
+        cache.text_to_textnodes("c")
+        self.assertEqual(list(cache.entries), ["a", "c"])
+        self.assertEqual(cache.counts(), (1, 3, 1))
+
+    def test_errors_not_cached(self):
+        cache = InlineCache(2)
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                cache.text_to_textnodes("**open")
+        self.assertEqual(len(cache.entries), 0)
+
+
+class TestMemo(unittest.TestCase):
+    def tearDown(self):
+        inlinecache.enable(0)
+
+    def test_same_tree_with_memo(self):
+        markdown = "# Title\n\n- [Back](/)\n- [Back](/)\n\n[Back](/)\n\n" + "x" * 600
+        expected = markdown_to_html_node(markdown).to_html()
+        inlinecache.enable(16)
+        self.assertEqual(markdown_to_html_node(markdown).to_html(), expected)
+        # The long paragraph bypasses the memo.
+        self.assertEqual(inlinecache.counts(), (2, 2, 0))
+        self.assertIn("2 hits, 2 misses (50.0% hit rate)", inlinecache.report())
+
+    def test_disabled_by_default(self):
+        inlinecache.enable(0)
+        inlinecache.memo_text_to_textnodes("a")
+        self.assertEqual(inlinecache.max_entries(), 0)
+        self.assertEqual(inlinecache.counts(), (0, 0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import unittest
+
+from linkcheck import check, report, resolve, site_map
+
+
+class TestLinkCheck(unittest.TestCase):
+    def setUp(self):
+        outputs = [
+            os.path.join("docs", "index.html"),
+            os.path.join("docs", "blog", "tom", "index.html"),
+            os.path.join("docs", "about.html"),
+            os.path.join("docs", "images", "tom.png"),
+        ]
+        self.urls = site_map(outputs, "docs")
+
+    def test_site_map(self):
+        self.assertEqual(
+            self.urls,
+            {"/", "/index.html", "/blog/tom/", "/blog/tom", "/blog/tom/index.html", "/about.html", "/images/tom.png"},
+        )
+
+    def test_resolve(self):
+        self.assertEqual(resolve("/blog/tom", "/"), "/blog/tom")
+        self.assertEqual(resolve("/blog/tom/?a=1#top", "/"), "/blog/tom/")
+        self.assertEqual(resolve("../../images/tom.png", "/blog/tom/"), "/images/tom.png")
+        self.assertEqual(resolve("tom.png", "/about.html"), "/tom.png")
+        self.assertIsNone(resolve("https://example.com/x", "/"))
+        self.assertIsNone(resolve("mailto:a@b.c", "/"))
+        self.assertIsNone(resolve("#section", "/"))
+
+    def test_check(self):
+        references = [
+            ("content/index.md", "/", "link", "/blog/tom"),
+            ("content/index.md", "/", "link", "/blog/gone"),
+            ("content/index.md", "/", "link", "https://example.com"),
+            ("content/blog/tom/index.md", "/blog/tom/", "image", "../../images/tom.png"),
+            ("content/blog/tom/index.md", "/blog/tom/", "image", "/images/missing.png"),
+        ]
+        problems = check(references, self.urls)
+        self.assertEqual(
+            problems,
+            [
+                {"source": "content/index.md", "kind": "link", "target": "/blog/gone", "resolved": "/blog/gone"},
+                {
+                    "source": "content/blog/tom/index.md",
+                    "kind": "image",
+                    "target": "/images/missing.png",
+                    "resolved": "/images/missing.png",
+                },
+            ],
+        )
+        self.assertEqual(report(problems, 5)["broken"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from copystatic import copy_files_incremental
+from gencontent import generate_pages_incremental
+from manifest import load_manifest, new_manifest, prune_outputs, save_manifest, write_if_changed
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+class TestIncrementalBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.static = os.path.join(self.root, "static")
+        self.public = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        write(os.path.join(self.content, "index.md"), "# Home\n\nhello")
+        write(os.path.join(self.content, "blog", "post", "index.md"), "# Post\n\nbody")
+        write(os.path.join(self.static, "index.css"), "body {}")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, manifest, basepath="/"):
+        with redirect_stdout(StringIO()):
+            copied = copy_files_incremental(self.static, self.public, manifest)
+            generated = generate_pages_incremental(
+                self.content, self.template, self.public, basepath, manifest
+            )
+        return copied, generated
+
+    def test_unchanged_rebuild_is_noop(self):
+        manifest = new_manifest()
+        self.assertEqual(self.build(manifest), (1, 2))
+        self.assertEqual(self.build(manifest), (0, 0))
+
+    def test_only_changed_page_rebuilt(self):
+        manifest = new_manifest()
+        self.build(manifest)
+        write(os.path.join(self.content, "index.md"), "# Home\n\nchanged")
+        self.assertEqual(self.build(manifest), (0, 1))
+        with open(os.path.join(self.public, "index.html")) as f:
+            self.assertIn("changed", f.read())
+
+    def test_template_or_basepath_change_rebuilds_all(self):
+        manifest = new_manifest()
+        self.build(manifest)
+        self.assertEqual(self.build(manifest, "/site/"), (0, 2))
+        write(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        self.assertEqual(self.build(manifest, "/site/"), (0, 2))
+
+    def test_deleted_source_removes_output(self):
+        manifest = new_manifest()
+        self.build(manifest)
+        os.remove(os.path.join(self.content, "blog", "post", "index.md"))
+        os.remove(os.path.join(self.static, "index.css"))
+        self.build(manifest)
+        self.assertFalse(os.path.exists(os.path.join(self.public, "blog")))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "index.css")))
+        self.assertTrue(os.path.exists(os.path.join(self.public, "index.html")))
+
+    def test_missing_output_is_regenerated(self):
+        manifest = new_manifest()
+        self.build(manifest)
+        os.remove(os.path.join(self.public, "index.html"))
+        self.assertEqual(self.build(manifest), (0, 1))
+
+    def test_manifest_round_trip(self):
+        manifest = new_manifest()
+        self.build(manifest)
+        path = os.path.join(self.root, ".cache", "manifest.json")
+        save_manifest(path, manifest)
+        self.assertEqual(load_manifest(path), manifest)
+
+    def test_full_rebuild_keeps_unchanged_outputs(self):
+        self.build(new_manifest())
+        page = os.path.join(self.public, "index.html")
+        os.utime(page, ns=(1, 1))
+        self.build(new_manifest())
+        self.assertEqual(os.stat(page).st_mtime_ns, 1)
+
+        write(os.path.join(self.content, "index.md"), "# Home\n\nchanged")
+        self.build(new_manifest())
+        self.assertNotEqual(os.stat(page).st_mtime_ns, 1)
+
+    def test_prune_outputs(self):
+        manifest = new_manifest()
+        self.build(manifest)
+        stale = os.path.join(self.public, "old", "gone.html")
+        write(stale, "x")
+        keep = [entry["dest"] for entry in manifest["pages"].values()]
+        keep.extend(entry["dest"] for entry in manifest["static"].values())
+        self.assertEqual(prune_outputs(self.public, keep), [stale])
+        self.assertFalse(os.path.exists(os.path.join(self.public, "old")))
+        self.assertTrue(os.path.exists(os.path.join(self.public, "blog", "post", "index.html")))
+
+    def test_write_if_changed(self):
+        path = os.path.join(self.root, "out", "page.html")
+        self.assertTrue(write_if_changed(path, b"one"))
+        self.assertFalse(write_if_changed(path, b"one"))
+        self.assertTrue(write_if_changed(path, b"two"))
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), b"two")
+        self.assertEqual(os.listdir(os.path.dirname(path)), ["page.html"])
+
+    def test_corrupt_manifest_starts_fresh(self):
+        path = os.path.join(self.root, "manifest.json")
+        write(path, "{not json")
+        self.assertEqual(load_manifest(path), new_manifest())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import pickle
+import unittest
+
+from block_markdown import markdown_to_html_node
+from pagemeta import PageMeta
+
+
+class TestPageMeta(unittest.TestCase):
+    def parse(self, markdown):
+        meta = PageMeta()
+        node = markdown_to_html_node(markdown, meta)
+        return node, meta
+
+    def test_collected_during_parse(self):
+        node, meta = self.parse(
+            "# Main **title**\n\n"
+            "Some text with a [link](/about) and ![pic](/img.png).\n\n"
+            "## Section\n\n"
+            "- one item\n- [two](https://example.com)\n\n"
+            "```\ncode words here\n```"
+        )
+        self.assertEqual(meta.title, "Main **title**")
+        self.assertEqual(meta.headings, [(1, "Main **title**"), (2, "Section")])
+        self.assertEqual(meta.links, ["/about", "https://example.com"])
+        self.assertEqual(meta.images, [("/img.png", "pic")])
+        self.assertEqual(meta.word_count, 17)
+        self.assertIn("<h1>Main <b>title</b></h1>", node.to_html())
+
+    def test_first_h1_is_the_title(self):
+        _, meta = self.parse("## sub\n\n# First\n\n# Second")
+        self.assertEqual(meta.title, "First")
+
+    def test_title_is_the_first_title_line(self):
+        # Same rule as extract_title: any line starting with "# ", even
+        # one inside a paragraph or a code block.
+        _, meta = self.parse("Intro line\n# My Title\n\nBody")
+        self.assertEqual(meta.title, "My Title")
+        _, meta = self.parse("```\n# in code\n```\n\n# Real")
+        self.assertEqual(meta.title, "in code")
+
+    def test_missing_title(self):
+        _, meta = self.parse("just text")
+        self.assertIsNone(meta.title)
+        with self.assertRaises(ValueError):
+            meta.require_title()
+
+    def test_pickle_and_dict(self):
+        _, meta = self.parse("# T\n\n[a](/b)")
+        self.assertEqual(pickle.loads(pickle.dumps(meta)), meta)
+        self.assertEqual(
+            meta.to_dict(),
+            {"title": "T", "headings": [[1, "T"]], "word_count": 2, "links": ["/b"], "images": [],
+             "front_matter": {}},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import time
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+import profiler
+from gencontent import generate_pages_recursive
+
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self):
+        profiler.reset()
+
+    def tearDown(self):
+        profiler.reset()
+        profiler._enabled = False
+
+    def test_disabled_records_nothing(self):
+        profiler.start_page("page.md")
+        with profiler.stage("parse"):
+            pass
+        self.assertIsNone(profiler.finish_page())
+
+    def test_nested_stage_is_exclusive(self):
+        profiler.enable()
+        profiler.start_page("page.md")
+        with profiler.stage("parse"):
+            time.sleep(0.01)
+            with profiler.stage("inline"):
+                time.sleep(0.02)
+        profiler.add_bytes(10)
+        record = profiler.finish_page()
+        parse_wall = record["stages"]["parse"][0]
+        inline_wall = record["stages"]["inline"][0]
+        self.assertGreaterEqual(inline_wall, 0.02)
+        self.assertLess(parse_wall, 0.02)
+        self.assertEqual(record["bytes"], 10)
+        self.assertEqual([span[0] for span in record["spans"]], ["parse"])
+
+    def test_build_report_and_trace(self):
+        profiler.enable()
+        with tempfile.TemporaryDirectory() as root:
+            content = os.path.join(root, "content")
+            os.makedirs(content)
+            for name in ("a", "b"):
+                with open(os.path.join(content, f"{name}.md"), "w") as f:
+                    f.write(f"# {name}\n\nsome **text** [link](/x)")
+            template = os.path.join(root, "template.html")
+            with open(template, "w") as f:
+                f.write("{{ Title }}{{ Content }}")
+            with redirect_stdout(StringIO()):
+                with profiler.phase("pages"):
+                    generate_pages_recursive(content, template, os.path.join(root, "docs"), "/", 2)
+
+            report = profiler.report(top=1)
+            self.assertIn("Page stages (2 pages", report)
+            self.assertIn("Slowest 1 pages:", report)
+
+            events = profiler.trace_events()
+            self.assertEqual(sum(1 for event in events if event["cat"] == "page"), 2)
+            self.assertTrue(all(event["ph"] == "X" and event["ts"] >= 0 for event in events))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import io
+import os
+import tarfile
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest import mock
+
+import gencontent
+import rendercache
+from gencontent import generate_pages_recursive
+from template import Template
+
+
+class TestRenderCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = os.path.join(self.tmp.name, "cache")
+        self.content = os.path.join(self.tmp.name, "content")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        for i in range(3):
+            self.write(os.path.join(self.content, f"post{i}", "index.md"), f"# Post {i}\n\n[home](/) **{i}**")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def build(self, dest, basepath="/", cache_dir=None):
+        dest = os.path.join(self.tmp.name, dest)
+        with redirect_stdout(StringIO()):
+            generate_pages_recursive(self.content, self.template, dest, basepath, cache_dir=cache_dir)
+        files = {}
+        for dir_path, _, filenames in os.walk(dest):
+            for filename in filenames:
+                with open(os.path.join(dir_path, filename), "rb") as f:
+                    files[os.path.relpath(os.path.join(dir_path, filename), dest)] = f.read()
+        return files
+
+    def test_key_covers_every_input(self):
+        template = Template("{{ Content }}")
+        key = rendercache.cache_key("# a", template, "/")
+        self.assertEqual(key, rendercache.cache_key("# a", Template("{{ Content }}"), "/"))
+        self.assertNotEqual(key, rendercache.cache_key("# b", template, "/"))
+        self.assertNotEqual(key, rendercache.cache_key("# a", Template("<p>{{ Content }}"), "/"))
+        self.assertNotEqual(key, rendercache.cache_key("# a", template, "/site/"))
+        with mock.patch.object(rendercache, "_generator_version", "other"):
+            self.assertNotEqual(key, rendercache.cache_key("# a", template, "/"))
+
+    def test_hit_skips_rendering_and_is_identical(self):
+        fresh = self.build("fresh", "/site/")
+        self.build("first", "/site/", self.cache)
+        with mock.patch.object(gencontent, "parse_page", side_effect=AssertionError("rendered")):
+            cached = self.build("cached", "/site/", self.cache)
+        self.assertEqual(cached, fresh)
+
+    def test_archive_round_trip(self):
+        self.build("first", "/", self.cache)
+        archive = os.path.join(self.tmp.name, "cache.tar.gz")
+        self.assertEqual(rendercache.export_archive(self.cache, archive), 3)
+        with open(archive, "rb") as f:
+            exported = f.read()
+        rendercache.export_archive(self.cache, archive)
+        with open(archive, "rb") as f:
+            self.assertEqual(f.read(), exported)
+
+        restored = os.path.join(self.tmp.name, "restored")
+        self.assertEqual(rendercache.import_archive(archive, restored), 3)
+        self.assertEqual(rendercache.import_archive(archive, restored), 0)
+        fresh = self.build("fresh", "/")
+        with mock.patch.object(gencontent, "parse_page", side_effect=AssertionError("rendered")):
+            self.assertEqual(self.build("second", "/", restored), fresh)
+
+    def test_import_ignores_foreign_members(self):
+        archive = os.path.join(self.tmp.name, "evil.tar.gz")
+        with tarfile.open(archive, "w:gz") as tar:
+            for name in ("../escape.render", "a" * 64 + ".render/x", "notes.txt"):
+                info = tarfile.TarInfo(name)
+                info.size = 1
+                tar.addfile(info, io.BytesIO(b"x"))
+        self.assertEqual(rendercache.import_archive(archive, self.cache), 0)
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, "escape.render")))
+
+
+if __name__ == "__main__":
+    unittest.main()
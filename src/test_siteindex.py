@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+import siteindex
+from gencontent import generate_pages_incremental, update_pages
+from manifest import new_manifest
+
+
+class TestSiteIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.content = os.path.join(root, "content")
+        self.public = os.path.join(root, "docs")
+        self.template = os.path.join(root, "template.html")
+        with open(self.template, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        self.index = siteindex.open_index(os.path.join(root, "index.sqlite"))
+        self.manifest = new_manifest()
+        self.write("index.md", "---\nlisting: blog\n---\n# Blog\n\nAll posts:")
+        self.write("blog/a/index.md", "---\ndate: 2022-01-10\ntags: [lotr]\nsummary: first\n---\n# A\n\n[home](/)")
+        self.write("blog/b/index.md", "---\ndate: 2023-05-01\ntags: [lotr, elves]\n---\n# B")
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp.cleanup()
+
+    def write(self, rel_path, text):
+        path = os.path.join(self.content, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def build(self):
+        with redirect_stdout(StringIO()):
+            return generate_pages_incremental(
+                self.content, self.template, self.public, "/", self.manifest, index=self.index
+            )
+
+    def read_output(self, rel_path):
+        with open(os.path.join(self.public, rel_path)) as f:
+            return f.read()
+
+    def test_listing_rendered_from_index(self):
+        self.assertEqual(self.build(), 3)
+        self.assertIn(
+            '<ul><li><a href="/blog/b/">B</a> (2023-05-01)</li>'
+            '<li><a href="/blog/a/">A</a> (2022-01-10): first</li></ul>',
+            self.read_output("index.html"),
+        )
+        self.assertEqual([row[0] for row in siteindex.tagged_pages(self.index, "elves")], [os.path.join(self.content, "blog", "b", "index.md")])
+
+    def test_listing_text_is_not_markdown(self):
+        self.write(
+            "blog/c/index.md",
+            "---\ntitle: Why [brackets](/x) and snake_case\n"
+            "summary: uses snake_case names and **stars**\n---\n# C\n",
+        )
+        self.build()
+        self.assertIn(
+            '<li><a href="/blog/c/">Why [brackets](/x) and snake_case</a>'
+            ": uses snake_case names and **stars**</li>",
+            self.read_output("index.html"),
+        )
+
+    def test_incremental_updates(self):
+        self.build()
+        self.assertEqual(self.build(), 0)
+
+        c = self.write("blog/c/index.md", "---\ndate: 2024-02-02\n---\n# C")
+        self.assertEqual(self.build(), 2)
+        self.assertIn('<a href="/blog/c/">C</a>', self.read_output("index.html"))
+
+        os.remove(c)
+        with redirect_stdout(StringIO()):
+            update_pages([c], self.content, self.template, self.public, "/", self.manifest, index=self.index)
+        self.assertNotIn("/blog/c/", self.read_output("index.html"))
+        self.assertNotIn(c, siteindex.page_hashes(self.index))
+
+    def test_lost_index_is_rebuilt(self):
+        self.build()
+        self.index.execute("DELETE FROM pages")
+        self.assertEqual(self.build(), 3)
+        self.assertEqual(len(siteindex.page_hashes(self.index)), 3)
+
+    def test_page_url(self):
+        self.assertEqual(siteindex.page_url("docs/index.html", "docs"), "/")
+        self.assertEqual(siteindex.page_url("docs/blog/a/index.html", "docs"), "/blog/a/")
+        self.assertEqual(siteindex.page_url("docs/about.html", "docs"), "/about.html")
+
+
+if __name__ == "__main__":
+    unittest.main()
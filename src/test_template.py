@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+
+from assets import AssetMap
+from gencontent import apply_basepath
+from htmlnode import LeafNode, ParentNode
+from template import Template, load_template
+
+
+class TestTemplate(unittest.TestCase):
+    def test_render(self):
+        template = Template("<title>{{ Title }}</title><article>{{ Content }}</article>")
+        self.assertEqual(template.slots(), ["Title", "Content"])
+        self.assertEqual(
+            template.render({"Title": "Hi", "Content": "<p>body</p>"}),
+            "<title>Hi</title><article><p>body</p></article>",
+        )
+
+    def test_unknown_slot_left_in_place(self):
+        template = Template("{{ Title }} {{ Footer }}")
+        self.assertEqual(template.render({"Title": "Hi"}), "Hi {{ Footer }}")
+
+    def test_basepath_only_rewrites_literals(self):
+        template = Template('<link href="/index.css" /><img src = "/a.png" />{{ Content }}', "/site/")
+        self.assertEqual(
+            template.render({"Content": '<a href="/raw">x</a>'}),
+            '<link href="/site/index.css" /><img src = "/site/a.png" /><a href="/raw">x</a>',
+        )
+
+    def test_assets_change_digest(self):
+        text = '<link href="/index.css" />{{ Content }}'
+        assets = AssetMap({"/index.css": "/index.0123456789ab.css"})
+        template = Template(text, "/", (), assets)
+        self.assertEqual(template.render({"Content": ""}), '<link href="/index.0123456789ab.css" />')
+        self.assertNotEqual(template.digest, Template(text).digest)
+
+    def test_load_template_cache(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "template.html")
+            with open(path, "w") as f:
+                f.write("one {{ Title }}")
+            first = load_template(path)
+            self.assertIs(load_template(path), first)
+            self.assertIsNot(load_template(path, "/site/"), first)
+
+            with open(path, "w") as f:
+                f.write("two {{ Title }}!")
+            self.assertEqual(load_template(path).render({"Title": "x"}), "two x!")
+
+    def test_partials(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "template.html")
+            header = os.path.join(root, "partials", "header.html")
+            nav = os.path.join(root, "partials", "nav.html")
+            os.makedirs(os.path.dirname(header))
+            for file_path, text in (
+                (path, "{{> partials/header.html }}{{ Content }}"),
+                (header, '<title>{{ Title }}</title>{{> nav.html }}'),
+                (nav, '<a href="/">home</a>'),
+            ):
+                with open(file_path, "w") as f:
+                    f.write(text)
+            template = load_template(path, "/site/")
+            self.assertEqual(template.partials, [header, nav])
+            self.assertEqual(
+                template.render({"Title": "T", "Content": "c"}), '<title>T</title><a href="/site/">home</a>c'
+            )
+
+            with open(nav, "w") as f:
+                f.write("<nav></nav>")
+            self.assertEqual(load_template(path, "/site/").render({"Title": "T", "Content": "c"}), "<title>T</title><nav></nav>c")
+
+            with open(nav, "w") as f:
+                f.write("{{> header.html }}")
+            with self.assertRaises(ValueError):
+                load_template(path)
+
+
+class TestApplyBasepath(unittest.TestCase):
+    def test_rewrites_root_relative_links(self):
+        node = ParentNode(
+            "div",
+            [
+                ParentNode("p", [LeafNode("a", "home", {"href": "/"}), LeafNode("a", "ext", {"href": "https://x.org/"})]),
+                LeafNode("img", "", {"src": "/a.png", "alt": "a"}),
+            ],
+        )
+        apply_basepath(node, "/site/")
+        self.assertEqual(
+            node.to_html(),
+            '<div><p><a href="/site/">home</a><a href="https://x.org/">ext</a></p><img src="/a.png" alt="a"></img></div>',
+        )
+
+    def test_maps_fingerprinted_assets(self):
+        node = ParentNode(
+            "div",
+            [LeafNode("a", "css", {"href": "/index.css"}), LeafNode("img", "", {"src": "/a.png", "alt": "a"})],
+        )
+        apply_basepath(node, "/site/", AssetMap({"/index.css": "/index.1.css", "/a.png": "/a.2.png"}))
+        self.assertEqual(
+            node.to_html(),
+            '<div><a href="/site/index.1.css">css</a><img src="/a.2.png" alt="a"></img></div>',
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
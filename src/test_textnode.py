@@ -1,5 +1,7 @@
+import pickle
 import unittest
 
+from htmlnode import LeafNode, ParentNode
 from textnode import TextNode, TextType
 
 
@@ -23,6 +25,38 @@ class TestTextNode(unittest.TestCase):
 
         self.assertNotEqual(node6, node7)
 
+    def test_not_equal_to_other_types(self):
+        node = TextNode("text", TextType.TEXT)
+        self.assertNotEqual(node, "text")
+        self.assertNotEqual(node, ("text", TextType.TEXT, None))
+
+    def test_hashable(self):
+        nodes = {
+            TextNode("a", TextType.LINKS, "/a"),
+            TextNode("a", TextType.LINKS, "/a"),
+            TextNode("a", TextType.LINKS, "/b"),
+        }
+        self.assertEqual(len(nodes), 2)
+
+    def test_immutable(self):
+        node = TextNode("text", TextType.TEXT)
+        with self.assertRaises(AttributeError):
+            node.text = "changed"
+        with self.assertRaises(AttributeError):
+            del node.url
+        with self.assertRaises(AttributeError):
+            node.extra = 1
+
+    def test_pickle_round_trip(self):
+        node = TextNode("link", TextType.LINKS, "/x")
+        self.assertEqual(pickle.loads(pickle.dumps(node)), node)
+
+    def test_slotted_nodes(self):
+        tree = ParentNode("p", [LeafNode("b", "x", {"class": "y"})])
+        for node in (TextNode("a", TextType.TEXT), tree, tree.children[0]):
+            self.assertFalse(hasattr(node, "__dict__"))
+        self.assertEqual(pickle.loads(pickle.dumps(tree)).to_html(), tree.to_html())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+
+from watch import diff_snapshots, hot_files, quick_snapshot, snapshot
+
+
+class TestSnapshot(unittest.TestCase):
+    def test_snapshot_and_diff(self):
+        with tempfile.TemporaryDirectory() as root:
+            content = os.path.join(root, "content")
+            os.makedirs(os.path.join(content, "blog"))
+            page = os.path.join(content, "blog", "index.md")
+            template = os.path.join(root, "template.html")
+            for path in (page, template):
+                with open(path, "w") as f:
+                    f.write("x")
+
+            old = snapshot([content, template, os.path.join(root, "missing")])
+            self.assertEqual(sorted(old), sorted([page, template]))
+            self.assertEqual(diff_snapshots(old, old), [])
+
+            with open(page, "w") as f:
+                f.write("longer")
+            os.remove(template)
+            new = snapshot([content, template])
+            self.assertEqual(diff_snapshots(old, new), sorted([page, template]))
+
+    def test_quick_snapshot(self):
+        with tempfile.TemporaryDirectory() as root:
+            blog = os.path.join(root, "blog")
+            os.makedirs(blog)
+            hot = os.path.join(blog, "hot.md")
+            cold = os.path.join(root, "cold.md")
+            for path in (hot, cold):
+                with open(path, "w") as f:
+                    f.write("x")
+            dirs = {}
+            files = snapshot([root], dirs)
+            self.assertEqual(sorted(dirs), sorted([root, blog]))
+
+            # Edits in place reach only the hot files until a full scan.
+            for path in (hot, cold):
+                with open(path, "w") as f:
+                    f.write("edited")
+            new_files, new_dirs = quick_snapshot(files, dirs, [hot])
+            self.assertEqual(diff_snapshots(files, new_files), [hot])
+            self.assertEqual(diff_snapshots(files, snapshot([root])), sorted([hot, cold]))
+
+            # Added and removed files move their directory's mtime.
+            added = os.path.join(blog, "new.md")
+            with open(added, "w") as f:
+                f.write("x")
+            os.remove(cold)
+            newer_files, _ = quick_snapshot(new_files, new_dirs, [])
+            self.assertEqual(diff_snapshots(new_files, newer_files), sorted([added, cold]))
+            self.assertEqual(newer_files, snapshot([root]))
+
+    def test_hot_files(self):
+        files = {"a": (1, 0), "b": (3, 0), "c": (2, 0)}
+        self.assertEqual(hot_files(files), ["b", "c", "a"])
+        self.assertEqual(hot_files(files, ["a", "gone"], ["b", "a"]), ["a", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
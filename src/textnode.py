@@ -10,18 +10,36 @@ class TextType(Enum):
     IMAGE = "image"
 
 class TextNode():
+    # Slotted and immutable: pages create TextNodes by the hundred thousand,
+    # and hashable nodes can be used as dict keys and set members.
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, text_type, url = None):
-        self.text = text
-        self.text_type = text_type
-        self.url = url
+        object.__setattr__(self, "text", text)
+        object.__setattr__(self, "text_type", text_type)
+        object.__setattr__(self, "url", url)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("TextNode is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("TextNode is immutable")
+
+    def __reduce__(self):
+        return (TextNode, (self.text, self.text_type, self.url))
 
     def __eq__(self, node):
+        if not isinstance(node, TextNode):
+            return NotImplemented
         return (
             self.text == node.text
             and self.text_type == node.text_type
             and self.url == node.url
         )
 
+    def __hash__(self):
+        return hash((self.text, self.text_type, self.url))
+
     def __repr__(self):
         return f"TextNode({self.text}, {self.text_type.value}, {self.url})"
 
@@ -0,0 +1,226 @@
+import argparse
+import functools
+import os
+import threading
+import time
+import traceback
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from copystatic import update_static_files
+from gencontent import generate_pages_incremental, update_pages
+from main import (
+    build,
+    default_basepath,
+    dir_path_ast_cache,
+    dir_path_content,
+    dir_path_public,
+    dir_path_static,
+    index_path,
+    manifest_path,
+    template_path,
+)
+from manifest import save_manifest
+from siteindex import open_index
+
+default_port = 8888
+default_interval = 0.05
+# A full scan stats every watched file. On a large site that costs more than
+# the polling interval, so full scans are spaced to take at most this share
+# of the time; the ticks between them relist changed directories and stat
+# only the hot files. An in-place edit to any other file is seen by the next
+# full scan, at worst scan time / share later.
+default_full_scan_share = 0.1
+hot_file_count = 32
+
+
+def snapshot(paths, dirs=None):
+    # Maps every file under paths to its (mtime, size); when dirs is given,
+    # it is filled with the mtime of every directory scanned.
+    files = {}
+    for path in paths:
+        if os.path.isdir(path):
+            _scan_dir(path, files, dirs)
+        elif os.path.isfile(path):
+            stat = os.stat(path)
+            files[path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+def _scan_dir(dir_path, files, dirs=None):
+    if dirs is not None:
+        dirs[dir_path] = os.stat(dir_path).st_mtime_ns
+    with os.scandir(dir_path) as entries:
+        for entry in entries:
+            path = os.path.join(dir_path, entry.name)
+            if entry.is_dir():
+                _scan_dir(path, files, dirs)
+            else:
+                stat = entry.stat()
+                files[path] = (stat.st_mtime_ns, stat.st_size)
+
+
+def quick_snapshot(files, dirs, hot):
+    # Adding, removing or renaming a file (which is how many editors save)
+    # moves its directory's mtime, so only those directories are listed
+    # again. An edit in place does not, so the hot files are stat'ed too;
+    # edits to other files wait for the next full scan.
+    new_files = dict(files)
+    new_dirs = dict(dirs)
+    for dir_path, mtime in dirs.items():
+        try:
+            current = os.stat(dir_path).st_mtime_ns
+        except FileNotFoundError:
+            current = None
+        if current == mtime:
+            continue
+        prefix = os.path.join(dir_path, "")
+        for path in [path for path in new_files if path.startswith(prefix)]:
+            del new_files[path]
+        for path in [path for path in new_dirs if path == dir_path or path.startswith(prefix)]:
+            del new_dirs[path]
+        if current is not None:
+            _scan_dir(dir_path, new_files, new_dirs)
+    for path in hot:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            new_files.pop(path, None)
+            continue
+        new_files[path] = (stat.st_mtime_ns, stat.st_size)
+    return new_files, new_dirs
+
+
+def hot_files(files, changed=(), hot=()):
+    # The files changed last are the ones likely to change next; a fresh
+    # watch starts from the most recently modified.
+    if not changed and not hot:
+        changed = sorted(files, key=lambda path: files[path][0], reverse=True)
+    ordered = [path for path in changed if path in files]
+    ordered.extend(path for path in hot if path in files and path not in changed)
+    return list(dict.fromkeys(ordered))[:hot_file_count]
+
+
+def diff_snapshots(old, new):
+    changed = [path for path, stat in new.items() if old.get(path) != stat]
+    changed.extend(path for path in old if path not in new)
+    return sorted(changed)
+
+
+def rebuild(changed, basepath, manifest, index=None):
+    partial_paths = set(partials(manifest))
+    if template_path in changed or any(path in partial_paths for path in changed):
+        # The dependency graph notices the template's or partial's new hash
+        # and regenerates the pages built with it.
+        generate_pages_incremental(
+            dir_path_content, template_path, dir_path_public, basepath, manifest, cache_dir=dir_path_ast_cache,
+            index=index,
+        )
+    else:
+        content = [path for path in changed if _is_under(path, dir_path_content)]
+        update_pages(
+            content, dir_path_content, template_path, dir_path_public, basepath, manifest, dir_path_ast_cache,
+            index,
+        )
+    static = [path for path in changed if _is_under(path, dir_path_static)]
+    update_static_files(static, dir_path_static, dir_path_public, manifest)
+    save_manifest(manifest_path, manifest)
+
+
+def partials(manifest):
+    return sorted({dep for kinds in manifest["deps"].values() for dep in kinds.get("partial", {})})
+
+def _is_under(path, dir_path):
+    return path.startswith(os.path.join(dir_path, ""))
+
+
+def _full_scan(watched):
+    start = time.perf_counter()
+    dirs = {}
+    files = snapshot(watched, dirs)
+    return files, dirs, time.perf_counter() - start
+
+
+def serve(port):
+    handler = functools.partial(SimpleHTTPRequestHandler, directory=dir_path_public)
+    server = ThreadingHTTPServer(("", port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def watch(basepath, port, interval, full_scan_share=default_full_scan_share):
+    manifest = build(basepath, incremental=True)
+    watched = [dir_path_content, dir_path_static, template_path] + partials(manifest)
+    files, dirs, scan_time = _full_scan(watched)
+    hot = hot_files(files)
+    last_scan = time.perf_counter()
+    server = serve(port)
+    index = open_index(index_path)
+    print(f"Serving {dir_path_public} on http://localhost:{port}/ (watching for changes)")
+    print(
+        f"Full scan of {len(files)} files took {scan_time * 1000:.1f}ms; in-place edits to files not changed "
+        f"recently are seen within {max(interval, scan_time / full_scan_share) * 1000:.0f}ms"
+    )
+    try:
+        while True:
+            time.sleep(interval)
+            if time.perf_counter() - last_scan >= scan_time / full_scan_share:
+                new_files, dirs, scan_time = _full_scan(watched)
+                last_scan = time.perf_counter()
+            else:
+                # The template and partials are few and always checked.
+                new_files, dirs = quick_snapshot(files, dirs, hot + watched[2:])
+            changed = diff_snapshots(files, new_files)
+            files = new_files
+            if not changed:
+                continue
+            hot = hot_files(files, changed, hot)
+            start = time.perf_counter()
+            try:
+                rebuild(changed, basepath, manifest, index)
+            except Exception:
+                traceback.print_exc()
+                continue
+            new_watched = [dir_path_content, dir_path_static, template_path] + partials(manifest)
+            if new_watched != watched:
+                # The template now includes other partials; watch those.
+                watched = new_watched
+                files, dirs, scan_time = _full_scan(watched)
+                last_scan = time.perf_counter()
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"Rebuilt {len(changed)} changed file(s) in {elapsed:.1f}ms")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        index.close()
+        server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild ./docs on change and serve it")
+    parser.add_argument("basepath", nargs="?", default=default_basepath)
+    parser.add_argument("--port", type=int, default=default_port)
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=default_interval,
+        help="seconds between checks for changes (full scans of large sites are spaced further apart)",
+    )
+    parser.add_argument(
+        "--full-scan-share",
+        type=float,
+        default=default_full_scan_share,
+        metavar="SHARE",
+        help="largest share of the time spent statting every watched file. Between full scans only changed "
+        f"directories and the {hot_file_count} most recently changed files are checked, so an in-place edit to "
+        "any other file can take up to full scan time / SHARE to be seen (printed at startup); 1 scans every "
+        "interval",
+    )
+    args = parser.parse_args()
+    if not 0 < args.full_scan_share <= 1:
+        parser.error("--full-scan-share must be above 0 and at most 1")
+    watch(args.basepath, args.port, args.interval, args.full_scan_share)
+
+
+if __name__ == "__main__":
+    main()